@@ -1,18 +1,20 @@
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from copilot_agent.lib.workflow_factory import generate_workflow, generate_dockerfile
 from copilot_agent.lib.config_helper import generate_vs_code_config, mask_config
 from pathlib import Path
 from copilot_agent.lib.github import (
     commit_files, create_pull_request, post_pr_comment,
     get_latest_workflow_run_for_ref, get_jobs_for_run, find_copilot_sub_pr,
-    get_pull_request_details, is_pull_request_merged, mark_pull_request_ready_for_review,
-    approve_pull_request, enable_pull_request_auto_merge, merge_pull_request,
-    get_active_org_prs_with_jira_keys
+    get_pull_request_details, is_pull_request_merged, merge_pull_request, ship_pull_request,
+    get_active_org_prs_with_jira_keys, get_file_text, close_session
 )
-from copilot_agent.lib.jira import post_jira_comment, transition_issue, get_issue_details, search_issues
+from copilot_agent.lib.jira import post_jira_comment, post_jira_comments_bulk, transition_issue, get_issue_details, search_issues
 from copilot_agent.lib.logger import setup_logger
+from copilot_agent.lib import json_utils
+from copilot_agent.lib.text_patch import apply_replacements, group_changes_by_path, parse_change_instructions
+from copilot_agent.lib.git_worktree import git_available, commit_patches_via_git
 from copilot_agent.lib.config import (
     AUTOPILOT_INTERVAL_SECONDS,
     DASHBOARD_POLL_INTERVAL_MS,
@@ -22,6 +24,9 @@ from copilot_agent.lib.config import (
     JIRA_KEY_PATTERN,
     MAX_ERROR_COUNT,
     MAX_POLL_INTERVAL_MS,
+    GIT_WORKTREE_MIN_FILES,
+    PRIORITY_ORDER,
+    DEFAULT_PRIORITY_RANK,
 )
 import os
 import time
@@ -31,15 +36,24 @@ import json
 import base64
 import requests
 import asyncio
+from operator import itemgetter
 from copilot_agent.lib.autopilot import Autopilot
 
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
+# Environment-derived settings read once at import (after .env is loaded)
+JIRA_BROWSE_URL = os.getenv("JIRA_BASE_URL", "") + "/browse/{}"
+GHUB_ORG = os.getenv("GHUB_ORG", "Unigalactix")
+DEFAULT_POST_PR_STATUS = os.getenv("POST_PR_STATUS", "In Progress")
+
 logger = setup_logger("app")
 app = FastAPI()
 
+# Repository root (config/, public/, mcp_config_template.json live here)
+PROJECT_ROOT = Path(__file__).parent.parent
+
 # Load optional per-board POST_PR_STATUS mapping
-BOARD_POST_PR_STATUS_PATH = Path(__file__).parent.parent / "config" / "board_post_pr_status.json"
+BOARD_POST_PR_STATUS_PATH = PROJECT_ROOT / "config" / "board_post_pr_status.json"
 board_post_pr_status = {}
 try:
     if BOARD_POST_PR_STATUS_PATH.exists():
@@ -57,7 +71,18 @@ def get_post_pr_status_for_issue(issue_key):
     if project_key and project_key in board_post_pr_status:
         return board_post_pr_status[project_key]
     
-    return os.getenv('POST_PR_STATUS', 'In Progress')
+    return DEFAULT_POST_PR_STATUS
+
+# Last formatted wall-clock second, reused for bursts of log/history entries
+_last_hms = [None, ""]
+
+def clock_hms():
+    """Return the local time as HH:MM:SS, formatting at most once per second."""
+    now = int(time.time())
+    if now != _last_hms[0]:
+        _last_hms[0] = now
+        _last_hms[1] = time.strftime("%H:%M:%S", time.localtime(now))
+    return _last_hms[1]
 
 # Global system status for dashboard
 system_status = {
@@ -74,8 +99,17 @@ system_status = {
     "nextScanTime": (time.time() + AUTOPILOT_INTERVAL_SECONDS) * MILLISECONDS_PER_SECOND,
 }
 
+# Bumped on every system_status mutation; /api/status uses it as a weak ETag.
+# Seeded from the clock so a restarted process never reissues an ETag an old client still holds.
+_status_version = time.time_ns()
+
+def mark_status_changed():
+    """Record that system_status changed so dashboard polls get a fresh body."""
+    global _status_version
+    _status_version += 1
+
 # Mount static files for dashboard
-public_dir = Path(__file__).parent.parent / "public"
+public_dir = PROJECT_ROOT / "public"
 if public_dir.exists():
     app.mount("/static", StaticFiles(directory=str(public_dir)), name="static")
     
@@ -102,17 +136,19 @@ async def startup_event():
     Consider migrating to @app.lifespan context manager in the future.
     """
     logger.info("Starting Copilot Agent...")
+    # uvicorn picks uvloop automatically (--loop auto) when it is installed
+    loop = asyncio.get_running_loop()
+    logger.info(f"Event loop: {type(loop).__module__}.{type(loop).__name__}")
     
     # Auto-generate MCP Config for visibility
     try:
-        root_dir = Path(__file__).parent.parent
-        config = generate_vs_code_config(root_dir)
+        config = generate_vs_code_config(PROJECT_ROOT)
         if "error" not in config:
             safe_config = mask_config(config)
             logger.info("----------------------------------------------------------------")
             logger.info("MCP CONFIGURATION (Copy to VS Code settings.json):")
             logger.info("(Secrets are masked in logs. Run scripts/generate_mcp_config.py to see full values)")
-            logger.info(json.dumps(safe_config, indent=2))
+            logger.info(json_utils.dumps_str(safe_config, indent=True))
             logger.info("----------------------------------------------------------------")
     except Exception as e:
         logger.warning(f"Failed to generate MCP config on startup: {e}")
@@ -130,15 +166,28 @@ async def startup_event():
     asyncio.create_task(reconcile_active_prs_on_startup())
     logger.info("PR reconciliation task launched.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled GitHub connections."""
+    close_session()
+
+async def read_json_body(req: Request):
+    """Parse a request body with orjson (when available) instead of Starlette's stdlib json."""
+    return json_utils.loads(await req.body())
+
 @app.get("/health")
 def health():
     logger.info("Health check requested")
     return {"status": "ok"}
 
 @app.get("/api/status")
-async def get_status():
-    """Return current system status for dashboard."""
-    return system_status
+async def get_status(request: Request):
+    """Return current system status for dashboard (304 when unchanged since last poll)."""
+    etag = f'W/"{_status_version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(json_utils.dumps(system_status), media_type="application/json", headers=headers)
 
 @app.get("/api/config")
 async def get_dashboard_config():
@@ -154,19 +203,21 @@ async def reconcile_active_prs_on_startup():
     try:
         await asyncio.sleep(5)  # Wait for startup to complete
         
-        org = os.getenv("GHUB_ORG", "Unigalactix")
+        org = GHUB_ORG
         logger.info(f"Reconciling active PRs in org: {org}")
         
-        prs = get_active_org_prs_with_jira_keys(org)
+        prs = await asyncio.to_thread(get_active_org_prs_with_jira_keys, org)
         
         if not prs:
             logger.info("No open PRs with Jira keys found to reconcile.")
             return
         
+        # Restart notices for every resumed ticket, posted together once the loop is done
+        resumed_comments = []
         for pr in prs:
             issue_key = pr.get("jiraKey")
             try:
-                issue = get_issue_details(issue_key)
+                issue = await asyncio.to_thread(get_issue_details, issue_key)
                 status_name = issue.get("status", "")
                 priority = issue.get("priority", "Medium")
                 
@@ -191,8 +242,8 @@ async def reconcile_active_prs_on_startup():
                     "key": issue_key,
                     "priority": priority,
                     "result": "Resumed",
-                    "time": time.strftime("%H:%M:%S"),
-                    "jiraUrl": f"{os.getenv('JIRA_BASE_URL', '')}/browse/{issue_key}",
+                    "time": clock_hms(),
+                    "jiraUrl": JIRA_BROWSE_URL.format(issue_key),
                     "prUrl": pr.get("prUrl"),
                     "repoName": pr.get("repoName"),
                     "branch": pr.get("branch"),
@@ -208,19 +259,20 @@ async def reconcile_active_prs_on_startup():
                 
                 system_status["scanHistory"].insert(0, history_item)
                 system_status["monitoredTickets"].append(history_item)
+                mark_status_changed()
                 
                 logger.info(f"Resumed monitoring PR {pr.get('prUrl')} for ticket {issue_key}")
-                
-                try:
-                    post_jira_comment(
-                        issue_key,
-                        f"🔁 Server restarted: resuming monitoring for active PR\nPR: {pr.get('prUrl')}"
-                    )
-                except:
-                    pass
+                resumed_comments.append(
+                    (issue_key, f"🔁 Server restarted: resuming monitoring for active PR\nPR: {pr.get('prUrl')}")
+                )
                     
             except Exception as e:
                 logger.warning(f"Failed to reconcile {issue_key}: {e}")
+        
+        # A missed notice shouldn't stop monitoring; just log it
+        failures = await asyncio.to_thread(post_jira_comments_bulk, resumed_comments)
+        for issue_key, e in failures.items():
+            logger.warning(f"Failed to post restart notice to {issue_key}: {e}")
                 
     except Exception as e:
         logger.error(f"Reconciliation error: {e}")
@@ -232,20 +284,22 @@ async def monitor_ci_checks():
     while True:
         try:
             if system_status["monitoredTickets"]:
-                for ticket in system_status["monitoredTickets"]:
+                # Snapshot: the list can change while we await the GitHub/Jira calls below
+                for ticket in list(system_status["monitoredTickets"]):
                     if not ticket.get("branch"):
                         continue
                     
                     # Get latest workflow run
                     ref = ticket.get("headSha") or ticket.get("branch")
-                    latest_run = get_latest_workflow_run_for_ref(
-                        ticket.get("repoName"), ref
+                    # Blocking HTTP (with retries) runs off the event loop
+                    latest_run = await asyncio.to_thread(
+                        get_latest_workflow_run_for_ref, ticket.get("repoName"), ref
                     )
                     
                     if latest_run and latest_run.get("id"):
-                        jobs = get_jobs_for_run(ticket.get("repoName"), latest_run["id"])
+                        jobs = await asyncio.to_thread(get_jobs_for_run, ticket.get("repoName"), latest_run["id"])
                         
-                        ticket["checks"] = [
+                        checks = [
                             {
                                 "name": job.get("name"),
                                 "status": job.get("status"),
@@ -254,45 +308,48 @@ async def monitor_ci_checks():
                             }
                             for job in jobs
                         ]
+                        if checks != ticket.get("checks"):
+                            ticket["checks"] = checks
+                            mark_status_changed()
                     
                     # Check for Copilot sub-PR
                     if not ticket.get("copilotMerged") and ticket.get("prUrl"):
                         try:
                             main_pr_number = int(ticket["prUrl"].split("/")[-1])
-                            sub_pr = find_copilot_sub_pr(ticket.get("repoName"), main_pr_number)
+                            sub_pr = await asyncio.to_thread(find_copilot_sub_pr, ticket.get("repoName"), main_pr_number)
                             
                             if sub_pr:
-                                ticket["copilotPrUrl"] = sub_pr.get("html_url")
+                                if ticket.get("copilotPrUrl") != sub_pr.get("html_url"):
+                                    ticket["copilotPrUrl"] = sub_pr.get("html_url")
+                                    mark_status_changed()
                                 
                                 # Check if WIP
                                 is_wip = "WIP" in sub_pr.get("title", "").upper()
                                 
                                 if not is_wip:
                                     # Try to undraft if needed
-                                    if sub_pr.get("draft"):
+                                    undraft = bool(sub_pr.get("draft"))
+                                    if undraft:
                                         logger.info(f"Marking sub-PR #{sub_pr['number']} ready for review")
-                                        mark_pull_request_ready_for_review(
-                                            ticket.get("repoName"), sub_pr["number"]
-                                        )
-                                        ticket["toolUsed"] = "Autopilot + Undraft"
-                                    else:
-                                        ticket["toolUsed"] = "Autopilot"
+                                    tool_used = "Autopilot + Undraft" if undraft else "Autopilot"
+                                    if ticket.get("toolUsed") != tool_used:
+                                        ticket["toolUsed"] = tool_used
+                                        mark_status_changed()
                                     
-                                    # Auto-approve
+                                    # Undraft + auto-approve + enable auto-merge in one GraphQL request
                                     logger.info(f"Auto-approving sub-PR #{sub_pr['number']}")
-                                    approve_result = approve_pull_request(ticket.get("repoName"), sub_pr["number"])
-                                    if not approve_result.get("ok"):
-                                        logger.warning(f"Failed to approve sub-PR #{sub_pr['number']}: {approve_result.get('error')}")
-                                    
-                                    # Enable auto-merge
-                                    auto_res = enable_pull_request_auto_merge(
-                                        ticket.get("repoName"), sub_pr["number"], "SQUASH"
+                                    ship = await asyncio.to_thread(
+                                        ship_pull_request, ticket.get("repoName"), sub_pr["number"],
+                                        node_id=sub_pr.get("node_id"), mark_ready=undraft, merge_method="SQUASH"
                                     )
+                                    if not ship["approved"]:
+                                        logger.warning(f"Failed to approve sub-PR #{sub_pr['number']}: {ship['errors'].get('approved')}")
                                     
-                                    if auto_res.get("ok"):
+                                    if ship["auto_merge"]:
                                         logger.info(f"Auto-merge enabled for sub-PR #{sub_pr['number']}")
                                         try:
-                                            post_jira_comment(
+                                            await asyncio.to_thread(
+                                                post_jira_comment,
                                                 ticket["key"],
                                                 f"🤖 **Copilot Update**: Auto-merge enabled for sub-PR #{sub_pr['number']}"
                                             )
@@ -300,23 +357,26 @@ async def monitor_ci_checks():
                                             pass
                                         
                                         # Check if already merged
-                                        merged_check = is_pull_request_merged(
-                                            ticket.get("repoName"), sub_pr["number"]
+                                        merged_check = await asyncio.to_thread(
+                                            is_pull_request_merged, ticket.get("repoName"), sub_pr["number"]
                                         )
                                         if merged_check.get("merged"):
                                             ticket["copilotMerged"] = True
+                                            mark_status_changed()
                                     else:
                                         # Fallback: try immediate merge
                                         logger.info(f"Attempting immediate merge for sub-PR #{sub_pr['number']}")
-                                        merge_res = merge_pull_request(
-                                            ticket.get("repoName"), sub_pr["number"], "squash"
+                                        merge_res = await asyncio.to_thread(
+                                            merge_pull_request, ticket.get("repoName"), sub_pr["number"], "squash"
                                         )
                                         
                                         if merge_res.get("merged"):
                                             ticket["copilotMerged"] = True
+                                            mark_status_changed()
                                             logger.info(f"Successfully merged sub-PR #{sub_pr['number']}")
                                             try:
-                                                post_jira_comment(
+                                                await asyncio.to_thread(
+                                                    post_jira_comment,
                                                     ticket["key"],
                                                     f"🤖 **Copilot Update**: PR #{sub_pr['number']} merged successfully"
                                                 )
@@ -330,20 +390,23 @@ async def monitor_ci_checks():
                     if ticket.get("prUrl"):
                         try:
                             pr_number = int(ticket["prUrl"].split("/")[-1])
-                            merged_check = is_pull_request_merged(
-                                ticket.get("repoName"), pr_number
+                            merged_check = await asyncio.to_thread(
+                                is_pull_request_merged, ticket.get("repoName"), pr_number
                             )
                             
                             if merged_check.get("merged"):
                                 logger.info(f"Main PR merged for {ticket['key']}, moving to Done")
                                 try:
-                                    post_jira_comment(
+                                    await asyncio.to_thread(
+                                        post_jira_comment,
                                         ticket["key"],
                                         f"✅ Pull Request #{pr_number} merged! Task complete."
                                     )
-                                    transition_issue(ticket["key"], "Done")
+                                    await asyncio.to_thread(transition_issue, ticket["key"], "Done")
                                     # Remove from monitored list
-                                    system_status["monitoredTickets"].remove(ticket)
+                                    if ticket in system_status["monitoredTickets"]:
+                                        system_status["monitoredTickets"].remove(ticket)
+                                    mark_status_changed()
                                 except Exception as e:
                                     logger.warning(f"Failed to transition {ticket['key']} to Done: {e}")
                         except:
@@ -354,9 +417,22 @@ async def monitor_ci_checks():
         
         await asyncio.sleep(CI_CHECK_INTERVAL_SECONDS)
 
-async def process_pipeline_job(data: dict):
+async def run_pipeline(
+    data: dict,
+    track_status: bool = True,
+    commit_message: str = "Add CI/CD pipeline and Dockerfile for {issue}",
+    ci_comment: str = "CI/CD Pipeline & Dockerfile updated.",
+    report_failure: bool = True,
+):
     """
-    Shared logic to process a CI/CD job from Webhook or Autopilot.
+    Shared CI/CD pipeline flow used by the webhook, /generate and Autopilot:
+    fetch Jira context, generate workflow + Dockerfile, commit, open/update the PR,
+    trigger Copilot and report back to Jira.
+
+    When track_status is True the job is reflected on the dashboard
+    (current ticket, logs, scan history and CI monitoring).
+    commit_message and ci_comment are formatted with {issue} and {repo};
+    report_failure posts a FAILURE comment to the Jira issue when the job errors.
     """
     issue_key = data.get("issueKey")
     repository = data.get("repository")
@@ -369,40 +445,47 @@ async def process_pipeline_job(data: dict):
         logger.error("Missing required fields: repository, language in job payload")
         return {"status": "error", "message": "Missing required fields: repository, language"}
 
-    # Update system status
-    system_status["currentPhase"] = "Processing"
-    system_status["currentTicketKey"] = issue_key
-    system_status["currentTicketLogs"] = []
-    system_status["currentJiraUrl"] = f"{os.getenv('JIRA_BASE_URL', '')}/browse/{issue_key}"
-    system_status["currentPrUrl"] = None
+    jira_url = JIRA_BROWSE_URL.format(issue_key) if issue_key else None
+
+    if track_status:
+        # Update system status
+        system_status["currentPhase"] = "Processing"
+        system_status["currentTicketKey"] = issue_key
+        system_status["currentTicketLogs"] = []
+        system_status["currentJiraUrl"] = jira_url
+        system_status["currentPrUrl"] = None
+        mark_status_changed()
     
     def log_progress(msg):
-        timestamp = time.strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {msg}"
         logger.info(msg)
-        system_status["currentTicketLogs"].append(log_entry)
+        if track_status:
+            timestamp = clock_hms()
+            system_status["currentTicketLogs"].append(f"[{timestamp}] {msg}")
+            mark_status_changed()
 
     log_progress(f"Processing job for {repository} ({language}). Build: {build_cmd}, Test: {test_cmd}")
 
     # 1. Fetch Jira Issue Context
-    summary = f"Task for {issue_key}"
+    summary = f"Task for {issue_key}" if issue_key else "CI/CD Pipeline Generation"
     description = ""
     if issue_key:
         try:
-            details = get_issue_details(issue_key)
+            details = await asyncio.to_thread(get_issue_details, issue_key)
             summary = details.get("summary") or summary
             description = details.get("description") or ""
         except Exception as e:
             logger.warning(f"Failed to fetch Jira details for {issue_key}: {e}")
 
-    owner, repo = repository.split("/")
-
     try:
+        owner, repo = repository.split("/")
+
         # 2. Generate Content
         log_progress("Generating workflow and Dockerfile...")
         workflow_content = generate_workflow(repository, language, build_cmd, test_cmd, deploy_target)
         docker_content = generate_dockerfile(language)
-        system_status["currentPayload"] = workflow_content
+        if track_status:
+            system_status["currentPayload"] = workflow_content
+            mark_status_changed()
         
         # Prepare Files for Commit
         files = {
@@ -414,37 +497,42 @@ async def process_pipeline_job(data: dict):
         branch = f"feature/copilot-{repo}"
         
         log_progress(f"Committing to branch {branch}...")
-        commit_info = commit_files(
-            owner, repo, branch, files, 
-            message=f"Add CI/CD pipeline and Dockerfile for {issue_key}",
+        # GitHub/Jira helpers block (and may back off on rate limits), so keep them off the event loop
+        commit_info = await asyncio.to_thread(
+            commit_files, owner, repo, branch, files,
+            message=commit_message.format(issue=issue_key or "manual request", repo=repo),
             issue_key=issue_key
         )
         
         # Create/Update PR (Idempotent)
         log_progress("Creating/updating Pull Request...")
-        pr_info = create_pull_request(owner, repo, commit_info["branch"], issue_key)
-        system_status["currentPrUrl"] = pr_info["pr_url"]
+        pr_info = await asyncio.to_thread(create_pull_request, owner, repo, commit_info["branch"], issue_key)
+        if track_status:
+            system_status["currentPrUrl"] = pr_info["pr_url"]
+            mark_status_changed()
 
-        # 3.5 Trigger Copilot via PR Comment
-        try:
-            copilot_prompt = (
-                f"@copilot please review this PR and fix any issues.\n\n"
-                f"**Task**: {summary}\n"
-                f"**Description**: {description}\n"
-                f"**Jira Issue**: {issue_key}"
-            )
-            post_pr_comment(owner, repo, pr_info["pr_number"], copilot_prompt)
-            log_progress(f"Posted Copilot comment on PR {pr_info['pr_url']}")
-        except Exception as e:
-            logger.warning(f"Failed to post Copilot comment on PR {pr_info['pr_url']}: {e}")
+        # 3.5 Trigger Copilot via PR Comment (only for Jira-backed jobs, as /generate always did)
+        if issue_key:
+            try:
+                copilot_prompt = (
+                    f"@copilot please review this PR and fix any issues.\n\n"
+                    f"**Task**: {summary}\n"
+                    f"**Description**: {description}\n"
+                    f"**Jira Issue**: {issue_key}"
+                )
+                await asyncio.to_thread(post_pr_comment, owner, repo, pr_info["pr_number"], copilot_prompt)
+                log_progress(f"Posted Copilot comment on PR {pr_info['pr_url']}")
+            except Exception as e:
+                logger.warning(f"Failed to post Copilot comment on PR {pr_info['pr_url']}: {e}")
 
         # 4. Feedback to Jira - Granular Updates
         if issue_key:
             # NOTIFY: CI Created
             try:
-                post_jira_comment(
-                    issue_key, 
-                    f"CI/CD Pipeline & Dockerfile updated.",
+                await asyncio.to_thread(
+                    post_jira_comment,
+                    issue_key,
+                    ci_comment.format(issue=issue_key, repo=repo),
                     link_text="Commit",
                     link_url=commit_info["commit_url"]
                 )
@@ -455,45 +543,46 @@ async def process_pipeline_job(data: dict):
             # NOTIFY: PR Opened (Only if new)
             if pr_info.get("is_new"):
                 try:
-                    post_jira_comment(
-                        issue_key, 
+                    await asyncio.to_thread(
+                        post_jira_comment,
+                        issue_key,
                         "Pull Request opened for review.",
                         link_text="View PR",
                         link_url=pr_info["pr_url"]
                     )
                     post_pr_status = get_post_pr_status_for_issue(issue_key)
-                    transition_issue(issue_key, post_pr_status)
+                    await asyncio.to_thread(transition_issue, issue_key, post_pr_status)
                     log_progress(f"Transitioned {issue_key} to '{post_pr_status}'")
                 except Exception as e:
                     logger.warning(f"Failed to post Jira comment or transition {issue_key} for PR: {e}")
 
         # Update history and monitoring
-        system_status["processedCount"] += 1
-        priority = data.get("priority", "Medium")
-        
-        history_item = {
-            "key": issue_key,
-            "priority": priority,
-            "result": "Success",
-            "time": time.strftime("%H:%M:%S"),
-            "jiraUrl": system_status["currentJiraUrl"],
-            "prUrl": pr_info["pr_url"],
-            "repoName": repository,
-            "branch": branch,
-            "payload": workflow_content,
-            "language": language,
-            "deployTarget": deploy_target,
-            "checks": [],
-            "headSha": commit_info.get("sha"),
-            "copilotPrUrl": None,
-            "copilotMerged": False,
-            "toolUsed": None,
-        }
-        
-        system_status["scanHistory"].insert(0, history_item)
-        system_status["monitoredTickets"].append(history_item)
+        if track_status:
+            system_status["processedCount"] += 1
+            history_item = {
+                "key": issue_key,
+                "priority": data.get("priority", "Medium"),
+                "result": "Success",
+                "time": clock_hms(),
+                "jiraUrl": jira_url,
+                "prUrl": pr_info["pr_url"],
+                "repoName": repository,
+                "branch": branch,
+                "payload": workflow_content,
+                "language": language,
+                "deployTarget": deploy_target,
+                "checks": [],
+                "headSha": commit_info.get("sha"),
+                "copilotPrUrl": None,
+                "copilotMerged": False,
+                "toolUsed": None,
+            }
+            
+            system_status["scanHistory"].insert(0, history_item)
+            system_status["monitoredTickets"].append(history_item)
+            mark_status_changed()
         
-        log_progress("Pipeline job completed successfully")
+        log_progress(f"Pipeline job completed: committed {commit_info['commit_url']}, PR {pr_info['pr_url']}")
 
         return {
             "status": "success",
@@ -504,18 +593,20 @@ async def process_pipeline_job(data: dict):
         log_progress(f"ERROR: {str(e)}")
         logger.exception(f"Failed to process pipeline job for {issue_key}")
         
-        # Update history with failure
-        system_status["scanHistory"].insert(0, {
-            "key": issue_key,
-            "priority": data.get("priority", "Medium"),
-            "result": "Failed",
-            "time": time.strftime("%H:%M:%S"),
-            "jiraUrl": system_status["currentJiraUrl"],
-        })
+        if track_status:
+            # Update history with failure
+            system_status["scanHistory"].insert(0, {
+                "key": issue_key,
+                "priority": data.get("priority", "Medium"),
+                "result": "Failed",
+                "time": clock_hms(),
+                "jiraUrl": jira_url,
+            })
+            mark_status_changed()
         
-        if issue_key:
+        if issue_key and report_failure:
             try:
-                post_jira_comment(issue_key, f"FAILURE: Could not create workflow. Error: {str(e)}")
+                await asyncio.to_thread(post_jira_comment, issue_key, f"FAILURE: Could not create workflow. Error: {str(e)}")
             except:
                 pass
         
@@ -524,11 +615,17 @@ async def process_pipeline_job(data: dict):
             "message": str(e)
         }
 
+async def process_pipeline_job(data: dict):
+    """
+    Process a CI/CD job from Webhook or Autopilot, tracked on the dashboard.
+    """
+    return await run_pipeline(data, track_status=True)
+
 @app.post("/webhook")
 async def webhook(req: Request):
     try:
-        data = await req.json()
-        logger.info(f"Received webhook: {json.dumps(data)}")
+        data = await read_json_body(req)
+        logger.info(f"Received webhook: {json_utils.dumps_str(data)}")
         return await process_pipeline_job(data)
     except Exception as e:
         logger.exception("Error in webhook processing:")
@@ -537,105 +634,16 @@ async def webhook(req: Request):
 @app.post("/generate")
 async def generate_pipeline(req: Request):
     try:
-        data = await req.json()
-        logger.info(f"Received generate request: {json.dumps(data)}")
-        issue_key = data.get("issueKey")
-        repository = data.get("repository")
-        language = data.get("language")
-        build_cmd = data.get("buildCommand")
-        test_cmd = data.get("testCommand")
-        deploy_target = data.get("deployTarget")
-
-        if not repository or not language:
-            logger.error("Missing required fields: repository, language in generate payload")
-            return {"status": "error", "message": "Missing required fields: repository, language"}
-
-        # ---------------------------------------------------------
-        # 1. Fetch Jira Issue Context (if issue_key provided)
-        # ---------------------------------------------------------
-        summary = f"Task for {issue_key}" if issue_key else "CI/CD Pipeline Generation"
-        description = ""
-        if issue_key:
-            try:
-                details = get_issue_details(issue_key)
-                summary = details.get("summary") or summary
-                description = details.get("description") or ""
-            except Exception as e:
-                logger.warning(f"Failed to fetch Jira details for {issue_key}: {e}")
-
-        owner, repo = repository.split("/")
-
-        # ---------------------------------------------------------
-        # 2. Create CI/CD Pipeline
-        # ---------------------------------------------------------
-        workflow_content = generate_workflow(repository, language, build_cmd, test_cmd, deploy_target)
-        docker_content = generate_dockerfile(language)
-        
-        files = {
-            f".github/workflows/{repo}-ci.yml": workflow_content,
-            "Dockerfile": docker_content
-        }
-        
-        # Single Feature Branch
-        branch = f"feature/copilot-{repo}"
-        
-        commit_info = commit_files(
-            owner, repo, branch, files,
-            message=f"Generate CI/CD and Dockerfile for {issue_key or 'manual request'}",
-            issue_key=issue_key
+        data = await read_json_body(req)
+        logger.info(f"Received generate request: {json_utils.dumps_str(data)}")
+        # /generate keeps its own commit message and Jira wording, and never posted a FAILURE comment
+        return await run_pipeline(
+            data,
+            track_status=False,
+            commit_message="Generate CI/CD and Dockerfile for {issue}",
+            ci_comment="CI/CD Pipeline updated at {repo}-ci.yml.",
+            report_failure=False,
         )
-        
-        pr_info = create_pull_request(owner, repo, commit_info["branch"], issue_key)
-        logger.info(f"Generated workflow, committed to {commit_info['commit_url']}, and opened/updated PR {pr_info['pr_url']}")
-
-        # ---------------------------------------------------------
-        # 2.5 Trigger Copilot via PR Comment (if issue_key provided)
-        # ---------------------------------------------------------
-        if issue_key:
-            try:
-                copilot_prompt = (
-                    f"@copilot please review this PR and fix any issues.\n\n"
-                    f"**Task**: {summary}\n"
-                    f"**Description**: {description}\n"
-                    f"**Jira Issue**: {issue_key}"
-                )
-                post_pr_comment(owner, repo, pr_info["pr_number"], copilot_prompt)
-                logger.info(f"Posted Copilot comment on PR {pr_info['pr_url']}")
-            except Exception as e:
-                logger.warning(f"Failed to post Copilot comment on PR {pr_info['pr_url']}: {e}")
-
-        # ---------------------------------------------------------
-        # 3. Feedback to Jira - Granular Updates (if issue_key provided)
-        # ---------------------------------------------------------
-        if issue_key:
-            try:
-                post_jira_comment(
-                    issue_key, 
-                    f"CI/CD Pipeline updated at {repo}-ci.yml.",
-                    link_text="Commit",
-                    link_url=commit_info["commit_url"]
-                )
-            except Exception as e:
-                logger.warning(f"Failed to post Jira comment about CI creation for {issue_key}: {e}")
-            
-            if pr_info.get("is_new"):
-                try:
-                    post_jira_comment(
-                        issue_key, 
-                        "Pull Request opened for review.",
-                        link_text="View PR",
-                        link_url=pr_info["pr_url"]
-                    )
-                    post_pr_status = get_post_pr_status_for_issue(issue_key)
-                    transition_issue(issue_key, post_pr_status)
-                    logger.info(f"Posted Jira comment and transitioned {issue_key} to '{post_pr_status}'")
-                except Exception as e:
-                    logger.warning(f"Failed to post Jira comment or transition {issue_key} for PR: {e}")
-
-        return {
-            "status": "success",
-            "ci_pr": pr_info["pr_url"]
-        }
     except Exception as e:
         logger.exception("Error in generate pipeline processing:")
         return {"status": "error", "message": str(e)}
@@ -644,7 +652,7 @@ async def generate_pipeline(req: Request):
 async def list_issues(req: Request):
     # ... (Existing list_issues logic OK) ...
     try:
-        data = await req.json()
+        data = await read_json_body(req)
     except Exception:
         data = {}
     jql = data.get("jql") or "project = D2 AND statusCategory != Done ORDER BY priority DESC, updated DESC"
@@ -679,26 +687,34 @@ async def list_issues(req: Request):
         logger.error(f"Jira search returned non-200 status: {resp.status_code}, response: {resp.text}")
         return {"status": "error", "code": resp.status_code, "message": resp.text}
 
-    issues = []
-    for i in resp.json().get("issues", []):
-        f = i.get("fields", {})
-        issues.append({
-            "key": i.get("key"),
+    # (rank, issue) pairs; the rank only orders the list and stays out of the response
+    ranked = []
+    append = ranked.append
+    browse_url = f"{base_url}/browse/"
+    for i in json_utils.loads(resp.content).get("issues", ()):
+        key = i.get("key")
+        f = i.get("fields") or {}
+        status = f.get("status") or {}
+        prio = f.get("priority") or {}
+        assignee = f.get("assignee") or {}
+        priority = prio.get("name")
+        append((PRIORITY_ORDER.get(priority or "Medium", DEFAULT_PRIORITY_RANK), {
+            "key": key,
             "summary": f.get("summary"),
-            "status": (f.get("status") or {}).get("name"),
-            "priority": (f.get("priority") or {}).get("name"),
-            "assignee": (f.get("assignee") or {}).get("displayName"),
-            "url": f"{base_url}/browse/{i.get('key')}",
-        })
-    prio_order = {"Highest":0, "High":1, "Medium":2, "Low":3, "Lowest":4}
-    issues.sort(key=lambda x: prio_order.get((x.get("priority") or "Medium"), 2))
+            "status": status.get("name"),
+            "priority": priority,
+            "assignee": assignee.get("displayName"),
+            "url": browse_url + str(key),
+        }))
+    ranked.sort(key=itemgetter(0))
+    issues = [issue for _, issue in ranked]
     logger.info(f"Found {len(issues)} Jira issues for JQL '{jql}'")
     return {"status": "success", "count": len(issues), "issues": issues}
 
 @app.post("/transition")
 async def transition(req: Request):
     # ... (Existing transition logic OK) ...
-    data = await req.json()
+    data = await read_json_body(req)
     issue_key = data.get("issueKey")
     target = data.get("targetStatus")
     logger.info(f"Received transition request for {issue_key} to {target}")
@@ -706,7 +722,7 @@ async def transition(req: Request):
         logger.error("Missing required fields: issueKey, targetStatus for transition")
         return {"status": "error", "message": "Missing required fields: issueKey, targetStatus"}
     try:
-        result = transition_issue(issue_key, target)
+        result = await asyncio.to_thread(transition_issue, issue_key, target)
         logger.info(f"Successfully transitioned {issue_key} to {target}")
         return {"status": "success", "result": result}
     except Exception as e:
@@ -717,7 +733,7 @@ async def transition(req: Request):
 async def list_transitions(req: Request):
     # ... (Existing list_transitions logic OK) ...
     try:
-        data = await req.json()
+        data = await read_json_body(req)
     except Exception:
         data = {}
     issue_key = data.get("issueKey")
@@ -740,41 +756,41 @@ async def list_transitions(req: Request):
         logger.exception(f"Error listing transitions for issue {issue_key}:")
         return {"status": "error", "message": str(e)}
 
-def _process_patches(owner, repo, changes, branch="main"):
+def _fetch_patched_file(owner, repo, path, replacements, branch):
+    """
+    Read one file (feature branch first, then main) and apply all of its find/replace pairs.
+    Returns (path, new_content), or None if the file cannot be read.
+    """
+    try:
+        # If we are on a persistent feature branch, read from it first, then fall back to main
+        content = get_file_text(owner, repo, path, branch)
+        if content is None:
+            content = get_file_text(owner, repo, path, "main")
+    except (requests.RequestException, UnicodeDecodeError) as e:
+        logger.error(f"Cannot read file '{path}': {e}")
+        return None
+    if content is None:
+        logger.error(f"Cannot read file '{path}': not found on {branch} or main")
+        return None
+         
+    return path, apply_replacements(content, replacements)
+
+async def _process_patches(owner, repo, changes, branch="main"):
     """
     Helper to read files, apply patches, and return dict of new content.
+    Each path is fetched once (concurrently) and all of its changes are applied in one pass.
     """
-    from copilot_agent.lib.github import get_repo
-    from github import GithubException
-    
-    repository = get_repo(owner, repo)
-    files_to_commit = {}
-    
-    for ch in changes:
-        path = ch["path"]
-        try:
-            # Try to get raw content from target branch (or main if new)
-            # Actually, if we are on a persistent feature branch, we should try reading from IT first.
-            try:
-                file = repository.get_contents(path, ref=branch)
-            except GithubException:
-                # Fallback to main
-                file = repository.get_contents(path, ref="main")
-                
-            content = file.decoded_content.decode("utf-8")
-        except GithubException as e:
-             logger.error(f"Cannot read file '{path}': {e}")
-             continue
-             
-        new_content = content.replace(ch.get("find", ""), ch.get("replace", ""))
-        files_to_commit[path] = new_content
-        
-    return files_to_commit
+    by_path = group_changes_by_path(changes)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_fetch_patched_file, owner, repo, path, replacements, branch)
+          for path, replacements in by_path.items())
+    )
+    return dict(r for r in results if r is not None)
 
 @app.post("/autofix")
 async def autofix(req: Request):
     """Parse Jira issue, apply simple text fixes, commit and open PR."""
-    data = await req.json()
+    data = await read_json_body(req)
     repository = data.get("repository")
     issue_key = data.get("issueKey")
     # base_branch ignored, using persistent feature branch
@@ -784,21 +800,12 @@ async def autofix(req: Request):
         return {"status": "error", "message": "Missing required fields"}
 
     owner, repo = repository.split("/")
-    details = get_issue_details(issue_key)
+    details = await asyncio.to_thread(get_issue_details, issue_key)
     summary = details.get("summary") or "Automated fix"
     description = (details.get("description") or "").strip()
 
     # Parse Instructions
-    changes = []
-    for line in description.splitlines():
-        parts = [p.strip() for p in line.split(",")]
-        entry = {}
-        for p in parts:
-            if "=" in p:
-                k, v = p.split("=", 1)
-                entry[k.strip()] = v.strip()
-        if entry.get("path") and (entry.get("find") is not None) and (entry.get("replace") is not None):
-            changes.append({"path": entry["path"], "find": entry.get("find", ""), "replace": entry.get("replace", "")})
+    changes = parse_change_instructions(description)
 
     if not changes:
         return {"status": "error", "message": "No valid change instructions found."}
@@ -806,17 +813,28 @@ async def autofix(req: Request):
     branch = f"feature/copilot-{repo}"
     
     try:
-        files = _process_patches(owner, repo, changes, branch)
-        if not files:
-             return {"status": "error", "message": "Could not apply patches (file not found?)"}
-             
-        commit_info = commit_files(
-            owner, repo, branch, files, 
-            message=f"Apply automated fixes for {issue_key}", 
-            issue_key=issue_key
-        )
+        message = f"Apply automated fixes for {issue_key}"
+        unique_paths = {ch["path"] for ch in changes}
+        if len(unique_paths) > GIT_WORKTREE_MIN_FILES and git_available():
+            # Many files: one shallow clone + push instead of per-file API round trips
+            commit_info = await asyncio.to_thread(
+                commit_patches_via_git, owner, repo, branch, changes, message, issue_key
+            )
+            if not commit_info:
+                return {"status": "error", "message": "Could not apply patches (file not found?)"}
+        else:
+            files = await _process_patches(owner, repo, changes, branch)
+            if not files:
+                 return {"status": "error", "message": "Could not apply patches (file not found?)"}
+                 
+            commit_info = await asyncio.to_thread(
+                commit_files,
+                owner, repo, branch, files, 
+                message=message, 
+                issue_key=issue_key
+            )
         
-        pr = create_pull_request(owner, repo, branch, issue_key)
+        pr = await asyncio.to_thread(create_pull_request, owner, repo, branch, issue_key)
         
         # Trigger Copilot
         try:
@@ -826,13 +844,13 @@ async def autofix(req: Request):
                 f"**Description**: {description}\n"
                 f"**Jira Issue**: {issue_key}"
             )
-            post_pr_comment(owner, repo, pr["pr_number"], copilot_prompt)
+            await asyncio.to_thread(post_pr_comment, owner, repo, pr["pr_number"], copilot_prompt)
         except Exception:
             pass
 
         if pr.get("is_new"):
             post_pr_status = get_post_pr_status_for_issue(issue_key)
-            transition_issue(issue_key, post_pr_status)
+            await asyncio.to_thread(transition_issue, issue_key, post_pr_status)
         
         return {"status": "success", "commit_url": commit_info["commit_url"], "pr_url": pr["pr_url"]}
         
@@ -2,13 +2,37 @@ import os
 import json
 import asyncio
 import re
+import time
+from collections import OrderedDict
+from operator import itemgetter
 from copilot_agent.lib.logger import setup_logger
-from copilot_agent.lib.jira import search_issues, get_issue_details, transition_issue, post_jira_comment, get_issue_comments
+from copilot_agent.lib import json_utils
+from copilot_agent.lib.jira import search_issues, search_issues_paged, get_issue_details, transition_issue, post_jira_comment, get_issue_comments
 from copilot_agent.lib.github import get_repo
-from github import GithubException
+from copilot_agent.lib import config as settings
 
 logger = setup_logger("autopilot")
 
+# Patterns used on every polled ticket, compiled once
+_JSON_BLOCK_RE = re.compile(r'```json\s*({.*?})\s*```', re.DOTALL)
+# "Repository: owner/repo", "Repo: owner/repo", "repository = owner/repo" (case insensitive)
+_REPO_RE = re.compile(r'(?:repository|repo)\s*[:=]\s*([\w\-\.]+/[\w\-\.]+)', re.IGNORECASE)
+_PR_URL_RE = re.compile(r'https://github.com/([^/]+)/([^/]+)/pull/(\d+)')
+
+# Tickets picked within this window are skipped (e.g. a failed transition left them in To Do)
+RECENT_TICKET_TTL_SECONDS = 300
+MAX_RECENT_TICKETS = 1024
+# Rows fetched per poll; JQL already orders by priority, a few extra only guard against ties/odd names
+POLL_WINDOW = 5
+
+def _project_scope(project_keys_env):
+    """Return the 'project in (...) AND ' JQL prefix for JIRA_PROJECT_KEYS, or '' for all projects."""
+    if project_keys_env and project_keys_env.upper() != "ALL":
+        project_keys = filter(None, (k.strip() for k in project_keys_env.split(",")))
+        projects_jql = ",".join(f'"{k}"' for k in project_keys)
+        return f'project in ({projects_jql}) AND '
+    return ""
+
 class Autopilot:
     def __init__(self, process_callback):
         self.process_callback = process_callback
@@ -16,6 +40,12 @@ class Autopilot:
         # Import interval from config
         from copilot_agent.lib.config import AUTOPILOT_INTERVAL_SECONDS
         self.interval = AUTOPILOT_INTERVAL_SECONDS
+        # JQL is fixed for the process lifetime; build it once instead of on every poll
+        scope = _project_scope(settings.JIRA_PROJECT_KEYS)
+        self.todo_jql = f'{scope}statusCategory = "To Do" ORDER BY priority DESC, created ASC'
+        self.review_jql = f'{scope}status = "In Review"'
+        # issue_key -> monotonic time it was last picked, oldest first
+        self._recent = OrderedDict()
     
     async def start(self):
         """Start the background polling loop."""
@@ -33,22 +63,26 @@ class Autopilot:
     def stop(self):
         self.running = False
 
+    def _recently_processed(self, issue_key, now):
+        seen_at = self._recent.get(issue_key)
+        return seen_at is not None and now - seen_at < RECENT_TICKET_TTL_SECONDS
+
+    def _recent_count(self, now):
+        return sum(1 for seen_at in self._recent.values() if now - seen_at < RECENT_TICKET_TTL_SECONDS)
+
+    def _remember(self, issue_key, now):
+        self._recent[issue_key] = now
+        self._recent.move_to_end(issue_key)
+        while len(self._recent) > MAX_RECENT_TICKETS:
+            self._recent.popitem(last=False)
+
     async def poll_and_process(self):
         """Fetch high priority tickets and process the first one found."""
-        project_keys_env = os.getenv("JIRA_PROJECT_KEYS")
-        
-        jql = ""
-        if project_keys_env and project_keys_env.upper() != "ALL":
-            project_keys = project_keys_env.split(",")
-            projects_jql = ",".join([f'"{k.strip()}"' for k in project_keys if k.strip()])
-            jql = f'project in ({projects_jql}) AND statusCategory = "To Do" ORDER BY priority DESC, created ASC'
-        else:
-            # Query all projects
-            jql = 'statusCategory = "To Do" ORDER BY priority DESC, created ASC'
+        jql = self.todo_jql
         
         try:
             logger.debug(f"Polling Jira with JQL: {jql}")
-            issues = search_issues(jql, max_results=100)
+            issues = await asyncio.to_thread(search_issues, jql, max_results=POLL_WINDOW)
         except Exception as e:
             logger.warning(f"Failed to poll Jira: {e}")
             return
@@ -59,31 +93,44 @@ class Autopilot:
 
         # Log summary of found tickets
         active_keys = [i.get("key") for i in issues]
-        logger.info(f"Autopilot: Found {len(issues)} active tickets: {', '.join(active_keys)}")
+        logger.info(f"Autopilot: Top {len(issues)} active tickets: {', '.join(active_keys)}")
 
-        # Prioritize (Already sorted by JQL, but ensuring strict priority)
-        prio_order = {"Highest": 0, "High": 1, "Medium": 2, "Low": 3, "Lowest": 4}
-        issues.sort(key=lambda x: prio_order.get((x.get("priority") or "Medium"), 2))
+        # Skip tickets we already picked recently so a stalled ticket isn't reprocessed every poll
+        now = time.monotonic()
+        candidates = [i for i in issues if not self._recently_processed(i.get("key"), now)]
+        if not candidates and len(issues) >= POLL_WINDOW:
+            # The window was full of skipped tickets; widen it past every recent key so lower tickets aren't starved
+            try:
+                issues = await asyncio.to_thread(search_issues_paged, jql, POLL_WINDOW + self._recent_count(now))
+            except Exception as e:
+                logger.warning(f"Failed to poll Jira: {e}")
+                return
+            candidates = [i for i in issues if not self._recently_processed(i.get("key"), now)]
+        if not candidates:
+            logger.debug("All polled tickets were processed recently; skipping this cycle.")
+            return
 
-        # Pick the top one
-        ticket = issues[0]
+        # Pick the top one (already sorted by JQL; min() keeps strict priority without a full sort)
+        ticket = min(candidates, key=itemgetter("_prio"))
         logger.info(f"Autopilot: Locked on ticket {ticket['key']} ({ticket['priority']})")
         
+        self._remember(ticket["key"], now)
         await self.process_ticket(ticket)
 
     async def process_ticket(self, ticket):
+        # Jira/GitHub calls are blocking; run them in threads so the event loop keeps serving requests
         issue_key = ticket["key"]
         
         # Transition to In Progress to lock it
         try:
-            transition_issue(issue_key, "In Progress")
+            await asyncio.to_thread(transition_issue, issue_key, "In Progress")
         except Exception as e:
             logger.warning(f"Could not transition {issue_key} to In Progress: {e}")
             return
 
         try:
             # 1. Fetch Details & Parse Context
-            details = get_issue_details(issue_key)
+            details = await asyncio.to_thread(get_issue_details, issue_key)
             description = details.get("description") or ""
             
             config = self._parse_context(issue_key, description)
@@ -91,12 +138,12 @@ class Autopilot:
             # 2. Enrich with Auto-Detection (if needed)
             repo_name = config.get("repository")
             if not repo_name:
-                default_repo = os.getenv("DEFAULT_REPO")
+                default_repo = settings.DEFAULT_REPO
                 logger.error(f"Failed to determine repository. DEFAULT_REPO env var is: '{default_repo}'")
                 raise ValueError(f"Could not determine Repository for {issue_key}. Please configure DEFAULT_REPO in .env or add JSON to ticket.")
             
             owner, repo = repo_name.split("/")
-            gh_repo = get_repo(owner, repo)
+            gh_repo = await asyncio.to_thread(get_repo, owner, repo)
             
             # Detect Language
             # Map GitHub language to our internal keys
@@ -121,15 +168,9 @@ class Autopilot:
             # Detect Deploy Target (Heuristic)
             # Default to github-pages if not specified, unless overridden
             if not config.get("deployTarget"):
-                config["deployTarget"] = "github-pages"
-                # Check if we should switch to azure? 
                 # User asked: "SET DEPLOY TARGET TO GITHUB PAGES BY DEFAULT"
-                # We can still check for index.html purely for logging but default is set.
-                try:
-                    gh_repo.get_contents("index.html")
-                    logger.info(f"Confirmed static site (index.html found) for {issue_key}")
-                except GithubException:
-                    pass 
+                # (no index.html probe: it only fed a log line and cost a GitHub round trip)
+                config["deployTarget"] = "github-pages"
 
             # 3. Execute Job
             payload = {
@@ -143,24 +184,29 @@ class Autopilot:
                 "testCommand": config.get("testCommand")
             }
             
-            logger.info(f"Autopilot executing job for {issue_key}: {json.dumps(payload)}")
-            post_jira_comment(issue_key, f"Autopilot engaging.\nTarget: {repo_name}\nConfig: {json.dumps(payload, indent=2)}")
+            logger.info(f"Autopilot executing job for {issue_key}: {json_utils.dumps_str(payload)}")
+            # Posted before the run so it precedes the pipeline's own PR/status comments
+            await asyncio.to_thread(
+                post_jira_comment,
+                issue_key,
+                f"Autopilot engaging.\nTarget: {repo_name}\nConfig: {json_utils.dumps_str(payload, indent=True)}",
+            )
             
             await self.process_callback(payload)
             
         except Exception as e:
             logger.error(f"Autopilot failed to process {issue_key}: {e}")
-            post_jira_comment(issue_key, f"Autopilot failed: {e}")
+            await asyncio.to_thread(post_jira_comment, issue_key, f"Autopilot failed: {e}")
 
     def _parse_context(self, issue_key, description):
         """Extract config from JSON block, Regex, or use Smart Defaults."""
         config = {}
         
         # 1. Try JSON Block
-        json_match = re.search(r'```json\s*({.*?})\s*```', description, re.DOTALL)
+        json_match = _JSON_BLOCK_RE.search(description)
         if json_match:
             try:
-                config = json.loads(json_match.group(1))
+                config = json_utils.loads(json_match.group(1))
                 logger.info(f"Parsed JSON config from description for {issue_key}")
             except json.JSONDecodeError:
                 logger.warning(f"Invalid JSON block in {issue_key}")
@@ -169,7 +215,7 @@ class Autopilot:
         if not config.get("repository"):
             # Patterns: "Repository: owner/repo", "Repo: owner/repo", "repository = owner/repo"
             # Case insensitive, supports colon or equals, optional whitespace
-            repo_match = re.search(r'(?:repository|repo)\s*[:=]\s*([\w\-\.]+/[\w\-\.]+)', description, re.IGNORECASE)
+            repo_match = _REPO_RE.search(description)
             if repo_match:
                 config["repository"] = repo_match.group(1).strip()
                 logger.info(f"Extracted repository from description regex: {config['repository']}")
@@ -183,7 +229,7 @@ class Autopilot:
             
             # Fallback to Global Default
             if not config["repository"]:
-                config["repository"] = os.getenv("DEFAULT_REPO")
+                config["repository"] = settings.DEFAULT_REPO
                 if config["repository"]:
                      logger.info(f"Using Global DEFAULT_REPO: {config['repository']}")
         
@@ -193,21 +239,15 @@ class Autopilot:
         """Watchdog: Check status of tickets in 'In Review'."""
         try:
             # Find tickets in 'In Review'
-            project_keys_env = os.getenv("JIRA_PROJECT_KEYS")
-            jql = ""
-            if project_keys_env and project_keys_env.upper() != "ALL":
-                project_keys = project_keys_env.split(",")
-                projects_jql = ",".join([f'"{k.strip()}"' for k in project_keys if k.strip()])
-                jql = f'project in ({projects_jql}) AND status = "In Review"'
-            else:
-                 jql = 'status = "In Review"'
-
-            issues = search_issues(jql, max_results=20)
+            issues = await asyncio.to_thread(search_issues, self.review_jql, max_results=20)
             if not issues:
                 return
 
-            for issue in issues:
-                await self.check_ticket_status(issue["key"])
+            # Tickets are independent; check them concurrently
+            await asyncio.gather(
+                *(self.check_ticket_status(issue["key"]) for issue in issues),
+                return_exceptions=True,
+            )
                 
         except Exception as e:
             logger.warning(f"Watchdog error: {e}")
@@ -215,32 +255,36 @@ class Autopilot:
     async def check_ticket_status(self, issue_key):
         """Check if linked PR is merged."""
         try:
-            comments = get_issue_comments(issue_key)
-            pr_url = None
+            comments = await asyncio.to_thread(get_issue_comments, issue_key)
             
-            # Find PR URL in comments
-            # Looking for "View PR" link or similar
+            # Find the newest PR URL in comments ("View PR" link or similar).
+            # The substring check is a cheap filter before running the regex.
+            match = None
             for c in reversed(comments):
-                # Simple regex or string find
-                match = re.search(r'https://github.com/([^/]+)/([^/]+)/pull/(\d+)', c["body"])
+                body = c["body"]
+                if "github.com" not in body:
+                    continue
+                match = _PR_URL_RE.search(body)
                 if match:
-                    pr_url = match.group(0)
-                    owner, repo, pr_number = match.group(1), match.group(2), match.group(3)
-                    
-                    # check status
-                    gh_repo = get_repo(owner, repo)
-                    pr = gh_repo.get_pull(int(pr_number))
-                    
-                    if pr.merged:
-                        logger.info(f"Watchdog: PR {pr_number} for {issue_key} is MERGED. Transitioning to Done.")
-                        post_jira_comment(issue_key, f"Pull Request #{pr_number} merged! Task complete.")
-                        transition_issue(issue_key, "Done")
-                    elif pr.state == 'closed':
-                        logger.info(f"Watchdog: PR {pr_number} for {issue_key} is CLOSED but NOT merged.")
-                        # Optional: Transition back to To Do?
-                    else:
-                        logger.debug(f"Watchdog: PR {pr_number} for {issue_key} is {pr.state}.")
-                    return # Found latest PR, stop checking comments
+                    break
+            if not match:
+                return
+
+            owner, repo, pr_number = match.group(1), match.group(2), match.group(3)
+            
+            # check status
+            gh_repo = await asyncio.to_thread(get_repo, owner, repo)
+            pr = await asyncio.to_thread(gh_repo.get_pull, int(pr_number))
+            
+            if pr.merged:
+                logger.info(f"Watchdog: PR {pr_number} for {issue_key} is MERGED. Transitioning to Done.")
+                await asyncio.to_thread(post_jira_comment, issue_key, f"Pull Request #{pr_number} merged! Task complete.")
+                await asyncio.to_thread(transition_issue, issue_key, "Done")
+            elif pr.state == 'closed':
+                logger.info(f"Watchdog: PR {pr_number} for {issue_key} is CLOSED but NOT merged.")
+                # Optional: Transition back to To Do?
+            else:
+                logger.debug(f"Watchdog: PR {pr_number} for {issue_key} is {pr.state}.")
             
         except Exception as e:
              logger.warning(f"Watchdog failed for {issue_key}: {e}")
@@ -2,6 +2,11 @@
 Configuration constants and settings for the application.
 """
 import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load .env here too: this module is imported before app.py calls load_dotenv
+load_dotenv(Path(__file__).parent.parent / ".env")
 
 # Timing Configuration
 AUTOPILOT_INTERVAL_SECONDS = int(os.getenv("AUTOPILOT_INTERVAL_SECONDS", "60"))
@@ -11,9 +16,19 @@ MILLISECONDS_PER_SECOND = 1000
 
 # GitHub Configuration
 COPILOT_USERNAME = os.getenv("COPILOT_USERNAME", "copilot")
+# Autofix jobs touching more files than this are committed via a shallow git clone
+# instead of one GitHub API call per file
+GIT_WORKTREE_MIN_FILES = int(os.getenv("GIT_WORKTREE_MIN_FILES", "3"))
 
 # Jira Configuration
 JIRA_KEY_PATTERN = os.getenv("JIRA_KEY_PATTERN", r'\b([A-Z]{2,10}-\d+)\b')
+# Sort rank for Jira priority names (lower is more urgent); unknown names rank as Medium
+PRIORITY_ORDER = {"Highest": 0, "High": 1, "Medium": 2, "Low": 3, "Lowest": 4}
+DEFAULT_PRIORITY_RANK = PRIORITY_ORDER["Medium"]
+# Comma-separated project keys Autopilot polls; unset or "ALL" polls every project
+JIRA_PROJECT_KEYS = os.getenv("JIRA_PROJECT_KEYS")
+# Fallback "owner/repo" when a ticket names no repository
+DEFAULT_REPO = os.getenv("DEFAULT_REPO")
 
 # Dashboard Configuration
 # Maximum number of consecutive errors before capping exponential backoff
@@ -1,60 +1,88 @@
 import os
-import json
+import copy
+import re
 from pathlib import Path
+from copilot_agent.lib import json_utils
+
+# KEY=value lines of a .env file; comment and blank lines never match
+_ENV_RE = re.compile(rb'(?m)^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*(.*?)[ \t\r]*$')
+
+# (env_path, template_path) -> (env_mtime, template_mtime, environ_deps, config)
+# environ_deps: ((var_name, os.environ value or None), ...) for placeholders .env didn't supply
+_CACHE = {}
+
+def _mtime(path: Path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
 
 def generate_vs_code_config(root_dir: Path) -> dict:
     """
     Generates the VS Code MCP configuration dictionary by merging
     the template with environment variables.
+    The result is cached until .env or the template changes on disk, or a process env var it fell back to changes.
     """
     env_path = root_dir / "copilot_agent" / ".env"
     template_path = root_dir / "mcp_config_template.json"
-    
+
+    cache_key = (env_path, template_path)
+    env_mtime, tmpl_mtime = _mtime(env_path), _mtime(template_path)
+    cached = _CACHE.get(cache_key)
+    if (cached and cached[0] == env_mtime and cached[1] == tmpl_mtime
+            and all(os.environ.get(name) == value for name, value in cached[2])):
+        return copy.deepcopy(cached[3])
+
     env_vars = {}
     if env_path.exists():
-        with open(env_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    env_vars[key.strip()] = value.strip()
+        with open(env_path, 'rb') as f:
+            data = f.read()
+        env_vars = {m.group(1).decode(): m.group(2).decode() for m in _ENV_RE.finditer(data)}
     
     if not template_path.exists():
         return {"error": f"Template not found at {template_path}"}
 
     # Read template
-    with open(template_path, 'r') as f:
-        config = json.load(f)
+    with open(template_path, 'rb') as f:
+        config = json_utils.loads(f.read())
     
     # Inject variables
+    environ_deps = []
     atlassian_env = config.get("mcpServers", {}).get("atlassian", {}).get("env", {})
     for key, value in atlassian_env.items():
         if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
             var_name = value[2:-1]
             if var_name in env_vars:
                 atlassian_env[key] = env_vars[var_name]
-            elif var_name in os.environ:
-                 atlassian_env[key] = os.environ[var_name]
-            # else leave as is or set to empty? keeping as is allows user to see what's missing
+            else:
+                # Record unset vars too, so exporting one later invalidates the cached result
+                environ_deps.append((var_name, os.environ.get(var_name)))
+                if var_name in os.environ:
+                    atlassian_env[key] = os.environ[var_name]
+                # else leave as is or set to empty? keeping as is allows user to see what's missing
     
-    return config
+    _CACHE[cache_key] = (env_mtime, tmpl_mtime, tuple(environ_deps), config)
+    return copy.deepcopy(config)
 
 def mask_config(config: dict) -> dict:
     """Returns a copy of the config with sensitive values masked."""
-    import copy
-    masked = copy.deepcopy(config)
-    
+    masked = {**config}
+    atlassian_env = config.get("mcpServers", {}).get("atlassian", {}).get("env", {})
+    if not atlassian_env:
+        return masked
+
+    # Only mcpServers.atlassian.env is modified, so copy just the dicts on that path
+    servers = masked["mcpServers"] = {**config["mcpServers"]}
+    atlassian = servers["atlassian"] = {**servers["atlassian"]}
+    atlassian_env = atlassian["env"] = dict(atlassian_env)
+
     # Masking rules: known env vars in the atlassian block
-    atlassian_env = masked.get("mcpServers", {}).get("atlassian", {}).get("env", {})
-    if atlassian_env:
-        for key in ["JIRA_API_TOKEN", "JIRA_USER_EMAIL"]: 
-            if key in atlassian_env and atlassian_env[key]:
-                val = atlassian_env[key]
-                if len(val) > 4:
-                    atlassian_env[key] = f"{val[:2]}...{val[-2:]}"
-                else:
-                    atlassian_env[key] = "***"
+    for key in ["JIRA_API_TOKEN", "JIRA_USER_EMAIL"]: 
+        if key in atlassian_env and atlassian_env[key]:
+            val = atlassian_env[key]
+            if len(val) > 4:
+                atlassian_env[key] = f"{val[:2]}...{val[-2:]}"
+            else:
+                atlassian_env[key] = "***"
     
     return masked
@@ -5,7 +5,7 @@ import uuid
 # Adjust path to import from lib
 sys.path.append(os.getcwd())
 from copilot_agent.lib.jira import get_issue_details
-from copilot_agent.lib.github import apply_text_patches
+from copilot_agent.lib.text_patch import parse_change_instructions, group_changes_by_path, apply_replacements
 
 def main():
     issue_key = os.getenv("ISSUE_KEY")
@@ -29,16 +29,7 @@ def main():
         description = ""
 
     print(f"Processing agent instructions from description...")
-    changes = []
-    for line in description.splitlines():
-        parts = [p.strip() for p in line.split(",")]
-        entry = {}
-        for p in parts:
-            if "=" in p:
-                k, v = p.split("=", 1)
-                entry[k.strip()] = v.strip()
-        if entry.get("path") and (entry.get("find") is not None) and (entry.get("replace") is not None):
-            changes.append({"path": entry["path"], "find": entry.get("find", ""), "replace": entry.get("replace", "")})
+    changes = parse_change_instructions(description)
 
     if not changes:
         print("No specific 'find/replace' instructions found. Agent execution finished with no changes.")
@@ -62,34 +53,33 @@ def main():
     # So this script should just modify the files on disk (in the runner).
     # We will re-implement a local patcher here instead of using the PyGithub lib which does API commits.
     
-    for ch in changes:
-        path = ch["path"]
+    # All changes to one path are applied in a single pass and written once
+    made_dirs = set()
+    for path, replacements in group_changes_by_path(changes).items():
         print(f"Modifying {path}...")
+        # Patch raw bytes: skips a decode/encode pass over every file
+        replacements = {f.encode("utf-8"): r.encode("utf-8") for f, r in replacements.items()}
         
-        # Ensure dir exists
-        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Ensure dir exists (once per directory)
+        parent = os.path.dirname(os.path.abspath(path))
+        if parent not in made_dirs:
+            os.makedirs(parent, exist_ok=True)
+            made_dirs.add(parent)
         
-        content = ""
-        if os.path.exists(path):
-            with open(path, "r", encoding="utf-8") as f:
-                content = f.read()
+        if b"" in replacements:
+            # No find text: the replace text becomes the file content (remaining finds apply on top),
+            # so the existing file never needs to be read
+            content = replacements[b""]
         else:
-            # If finding something in a new file, assume empty start
-            pass
+            try:
+                with open(path, "rb") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                # If finding something in a new file, assume empty start
+                content = b""
+        new_content = apply_replacements(content, replacements)
             
-        find_text = ch.get("find", "")
-        replace_text = ch.get("replace", "")
-        
-        if find_text:
-            new_content = content.replace(find_text, replace_text)
-        else:
-            # If no find text behavior (append? overwrite?)
-            # For this simple logic, if file didn't exist, we write replace_text
-            # If file exists and find is empty, we append? Let's just overwrite for safety or append if specified.
-            # User request didn't specify strict logic, assume simple replacement.
-            new_content = replace_text
-            
-        with open(path, "w", encoding="utf-8") as f:
+        with open(path, "wb") as f:
             f.write(new_content)
     
     print("Agent generation complete.")
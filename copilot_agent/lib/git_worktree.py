@@ -0,0 +1,152 @@
+import os
+import base64
+import shutil
+import subprocess
+import tempfile
+from copilot_agent.lib.logger import setup_logger
+from copilot_agent.lib.jira import post_jira_comment
+from copilot_agent.lib.github import forget_missing_branch
+from copilot_agent.lib.text_patch import group_changes_by_path, apply_replacements
+
+logger = setup_logger("git_worktree")
+
+GIT_AUTHOR_NAME = "Copilot Agent"
+GIT_AUTHOR_EMAIL = "copilot-agent@users.noreply.github.com"
+# Upper bound for one git invocation (clone/fetch/push included) so a stalled remote can't pin a worker thread
+GIT_TIMEOUT_SECONDS = 120
+
+
+def git_available():
+    """True if the git CLI can be used for working-tree commits."""
+    return shutil.which("git") is not None
+
+
+def _git(args, cwd=None, token=None, raw=False):
+    """
+    Run a git command non-interactively with a timeout.
+    The token goes in as an extra header via GIT_CONFIG_* env vars, so it is in neither URLs nor argv.
+    Returns stripped text, or the untouched stdout bytes when raw=True (file contents).
+    """
+    env = {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+    if token:
+        basic = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        # Append after any GIT_CONFIG_* entries already in the environment
+        n = int(env.get("GIT_CONFIG_COUNT") or 0)
+        env["GIT_CONFIG_COUNT"] = str(n + 1)
+        env[f"GIT_CONFIG_KEY_{n}"] = "http.extraheader"
+        env[f"GIT_CONFIG_VALUE_{n}"] = f"AUTHORIZATION: basic {basic}"
+    try:
+        result = subprocess.run(
+            ["git"] + args, cwd=cwd, env=env, capture_output=True, text=not raw,
+            timeout=GIT_TIMEOUT_SECONDS, check=False,
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"git {args[0]} timed out after {GIT_TIMEOUT_SECONDS}s")
+    if result.returncode != 0:
+        stderr = result.stderr.decode("utf-8", "replace") if raw else result.stderr
+        raise RuntimeError(f"git {args[0]} failed: {stderr.strip()}")
+    return result.stdout if raw else result.stdout.strip()
+
+
+def commit_patches_via_git(owner, repo, branch, changes, message, issue_key=None):
+    """
+    Apply find/replace changes through a shallow clone and push them as a single commit.
+    Creates the branch from the default branch if it doesn't exist.
+    Returns the same shape as github.commit_files, or None if no file changed.
+    """
+    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
+    if not token:
+        raise RuntimeError("GITHUB_TOKEN or GHUB_TOKEN environment variable is not set")
+    url = f"https://github.com/{owner}/{repo}.git"
+
+    # One round trip answers both "does the branch exist" and "what is the default branch";
+    # auth/network/repo errors surface here with git's own message instead of being read as a missing branch
+    default_branch, on_branch = None, False
+    for line in _git(["ls-remote", "--symref", url, "HEAD", f"refs/heads/{branch}"], token=token).splitlines():
+        ref, _, name = line.partition("\t")
+        if name == "HEAD" and ref.startswith("ref: refs/heads/"):
+            default_branch = ref[len("ref: refs/heads/"):]
+        elif name == f"refs/heads/{branch}":
+            on_branch = True
+    default_branch = default_branch or "main"
+
+    with tempfile.TemporaryDirectory(prefix="copilot-agent-") as workdir:
+        if on_branch:
+            _git(["clone", "--depth", "1", "--branch", branch, url, workdir], token=token)
+            logger.info(f"Cloned {owner}/{repo}@{branch}")
+        else:
+            # Branch doesn't exist yet: start from the default branch
+            _git(["clone", "--depth", "1", "--branch", default_branch, url, workdir], token=token)
+            _git(["checkout", "-b", branch], cwd=workdir)
+            logger.info(f"Branch '{branch}' new. Baselining from {default_branch} of {owner}/{repo}")
+
+        changed_paths = []
+        default_fetched = False
+        for path, replacements in group_changes_by_path(changes).items():
+            full_path = os.path.join(workdir, path)
+            if not os.path.realpath(full_path).startswith(os.path.realpath(workdir) + os.sep):
+                logger.error(f"Refusing to patch path outside repository: '{path}'")
+                continue
+            # Bytes in and out so CRLF files stay CRLF and \r\n finds can match (same as the API path)
+            try:
+                with open(full_path, "rb") as f:
+                    content = f.read()
+            except FileNotFoundError:
+                content = None
+            except OSError as e:
+                logger.error(f"Cannot read file '{path}': {e}")
+                continue
+            if content is None and on_branch:
+                # Like _fetch_patched_file: a file missing on the feature branch is read from the base branch
+                try:
+                    if not default_fetched:
+                        _git(["fetch", "--depth", "1", "origin", default_branch], cwd=workdir, token=token)
+                        default_fetched = True
+                    content = _git(["show", f"FETCH_HEAD:{path}"], cwd=workdir, raw=True)
+                except RuntimeError:
+                    content = None
+            if content is None:
+                logger.error(f"Cannot read file '{path}': not found on {branch} or {default_branch}")
+                continue
+            try:
+                content.decode("utf-8")
+            except UnicodeDecodeError as e:
+                logger.error(f"Cannot read file '{path}': {e}")
+                continue
+            encoded = {find.encode("utf-8"): repl.encode("utf-8") for find, repl in replacements.items()}
+            new_content = apply_replacements(content, encoded)
+            if new_content != content:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, "wb") as f:
+                    f.write(new_content)
+                changed_paths.append(path)
+
+        if not changed_paths:
+            return None
+
+        _git(["add", "--"] + changed_paths, cwd=workdir)
+        _git([
+            "-c", f"user.name={GIT_AUTHOR_NAME}", "-c", f"user.email={GIT_AUTHOR_EMAIL}",
+            "commit", "-q", "-m", message,
+        ], cwd=workdir)
+        sha = _git(["rev-parse", "HEAD"], cwd=workdir)
+        _git(["push", "origin", f"HEAD:refs/heads/{branch}"], cwd=workdir, token=token)
+        # The branch exists now; don't let commit_files trust an earlier "missing" probe
+        forget_missing_branch(owner, repo, branch)
+        logger.info(f"Pushed commit {sha} to {branch} ({len(changed_paths)} files)")
+
+    commit_url = f"https://github.com/{owner}/{repo}/commit/{sha}"
+
+    # Notify Jira
+    if issue_key:
+        try:
+            post_jira_comment(
+                issue_key,
+                f"Committed changes to `{branch}`.\nMessage: {message}",
+                link_text="View Commit",
+                link_url=commit_url
+            )
+        except Exception:
+            pass
+
+    return {"commit_url": commit_url, "branch": branch, "sha": sha}
@@ -1,25 +1,178 @@
 import os
+import re
 import base64
 import time
 import requests
-from github import Github, InputGitTreeElement, GithubException
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from urllib3.util.retry import Retry
+from functools import lru_cache
+from urllib.parse import quote
+from github import Auth, Github, InputGitTreeElement, GithubException
 from copilot_agent.lib.logger import setup_logger
 from copilot_agent.lib.jira import post_jira_comment
+from copilot_agent.lib.cache import TTLCache
+from copilot_agent.lib.config import JIRA_KEY_PATTERN
 
 logger = setup_logger("github")
 
+# Repository handles keyed by (owner, repo_name, token); avoids a GET /repos/{owner}/{repo} per call
+_repo_cache = TTLCache(maxsize=256, ttl=300)
+# cache_key -> (ETag, parsed body) for polled endpoints; see _conditional_get
+_etag_cache = TTLCache(maxsize=512, ttl=3600)
+# (owner, repo, branch) keys of branches recently probed as missing (negative cache only: an existing
+# ref can be moved by git_worktree, another worker or a human push, so its SHA is always re-read)
+_missing_branch_cache = TTLCache(maxsize=1024, ttl=30)
+
+
+# Sized for the thread pools used for concurrent reads/writes
+GITHUB_POOL_SIZE = 20
+GRAPHQL_URL = "https://api.github.com/graphql"
+_JIRA_KEY_RE = re.compile(JIRA_KEY_PATTERN)
+
+
+# Longest we'll block a call waiting for the primary rate limit to reset
+RATE_LIMIT_MAX_WAIT_SECONDS = 60
+# Cap on a server-sent Retry-After (secondary rate limits can ask for a minute or more)
+RETRY_AFTER_MAX_SECONDS = 10
+
+
+class _GitHubRetry(Retry):
+    """
+    Retry policy for the shared session: idempotent methods retry on 429/5xx, while POST/PATCH
+    (REST writes, GraphQL mutations) only retry on 429, where GitHub did not process the request.
+    A 502/503/504 on a mutation may have been applied, so replaying it could e.g. post a second review.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method and method.upper() in ("POST", "PATCH") and status_code != 429:
+            return False
+        if status_code == 429 and self.total:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        return None if retry_after is None else min(retry_after, RETRY_AFTER_MAX_SECONDS)
+
+
+class _GitHubSession(requests.Session):
+    """Session that waits out a short primary rate-limit reset and retries once."""
+
+    def request(self, method, url, **kwargs):
+        response = super().request(method, url, **kwargs)
+        if response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = response.headers.get("X-RateLimit-Reset")
+            wait = max(1, int(reset) - int(time.time())) if reset and reset.isdigit() else None
+            if wait is not None and wait <= RATE_LIMIT_MAX_WAIT_SECONDS:
+                logger.warning(f"GitHub rate limit exhausted; retrying {method} {url} in {wait}s")
+                time.sleep(wait)
+                response = super().request(method, url, **kwargs)
+        return response
+
+
+# Shared session for the raw REST helpers: keeps connections (and TLS sessions) alive between calls
+_SESSION = _GitHubSession()
+_SESSION.headers.update({
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=GITHUB_POOL_SIZE,
+    # 429/5xx retries with backoff, honouring a capped Retry-After (secondary rate limits send it)
+    max_retries=_GitHubRetry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    ),
+))
+
+
+def _token():
+    return os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
+
+def _auth_headers(token=None):
+    return {"Authorization": f"Bearer {token or _token()}"}
+
+def _graphql_payload(query, variables=None):
+    """POST a GraphQL query on the shared session; returns the whole payload (data + errors)."""
+    response = _SESSION.post(
+        GRAPHQL_URL,
+        headers=_auth_headers(),
+        json={"query": query, "variables": variables or {}},
+        timeout=30,
+    )
+    response.raise_for_status()
+    return response.json()
+
+def _graphql(query, variables=None):
+    """POST a GraphQL query on the shared session; returns `data`, raising on HTTP or GraphQL errors."""
+    payload = _graphql_payload(query, variables)
+    if payload.get("errors"):
+        raise RuntimeError(f"GraphQL errors: {payload['errors']}")
+    return payload["data"]
+
+def _conditional_get(cache_key, url, params=None):
+    """
+    GET JSON with If-None-Match. A 304 reuses the cached body and doesn't count
+    against the primary rate limit, which is what the CI polling loops mostly get.
+    """
+    headers = _auth_headers()
+    cached = _etag_cache.get(cache_key)
+    if cached:
+        headers["If-None-Match"] = cached[0]
+    response = _SESSION.get(url, headers=headers, params=params, timeout=10)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    response.raise_for_status()
+    data = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        _etag_cache.set(cache_key, (etag, data))
+    return data
+
+def _run_concurrently(funcs):
+    """Run independent no-argument calls in parallel threads and wait for all of them."""
+    if len(funcs) < 2:
+        for fn in funcs:
+            fn()
+        return
+    with ThreadPoolExecutor(max_workers=len(funcs)) as ex:
+        for future in [ex.submit(fn) for fn in funcs]:
+            future.result()
+
+def close_session():
+    """Close pooled connections (call on shutdown)."""
+    _SESSION.close()
+
+
+@lru_cache(maxsize=4)
+def _github_for(token):
+    """One PyGithub client per token so its HTTP connection pool (and TLS sessions) is reused."""
+    # per_page=100 cuts pagination round trips for get_pulls and friends (default is 30)
+    return Github(auth=Auth.Token(token), pool_size=GITHUB_POOL_SIZE, per_page=100)
 
 def _get_github_instance():
-    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
+    token = _token()
     if not token:
         raise RuntimeError("GITHUB_TOKEN or GHUB_TOKEN environment variable is not set")
-    return Github(token)
+    return _github_for(token)
 
 def get_repo(owner, repo_name):
     g = _get_github_instance()
+    # Keyed by token too: a handle is bound to the client (and permissions) that fetched it
+    key = (owner, repo_name, _token())
+    repo = _repo_cache.get(key)
+    if repo is not None:
+        return repo
+
     try:
         repo = g.get_repo(f"{owner}/{repo_name}")
         logger.info(f"Successfully retrieved repository: {owner}/{repo_name}")
+        _repo_cache.set(key, repo)
         return repo
     except GithubException as e:
         logger.error(f"Failed to get repository {owner}/{repo_name}: {e}")
@@ -30,18 +183,10 @@ def assign_issue_to_copilot(owner, repo, issue_number, pat_token=None):
     Assigns a GitHub issue to Copilot using REST API.
     Ref: https://github.blog/changelog/2025-12-03-assign-issues-to-copilot-using-the-api/
     """
-    if pat_token is None:
-        pat_token = os.getenv('GHUB_TOKEN') or os.getenv('GITHUB_TOKEN')
-    
     url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/assignees"
-    headers = {
-        "Authorization": f"token {pat_token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
     data = {"assignees": ["copilot"]}
     
-    response = requests.post(url, headers=headers, json=data)
+    response = _SESSION.post(url, headers=_auth_headers(pat_token), json=data, timeout=10)
     response.raise_for_status()
     return response.json()
 
@@ -49,34 +194,55 @@ def add_label_to_issue(owner, repo, issue_number, labels):
     """Add labels to an issue.
     Ref: provided user script
     """
-    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
     url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/labels"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
     payload = {"labels": labels}
     
-    response = requests.post(url, headers=headers, json=payload)
+    response = _SESSION.post(url, headers=_auth_headers(), json=payload, timeout=10)
     response.raise_for_status()
     return response.json()
 
+def get_file_text(owner, repo, path, ref):
+    """
+    Fetch a file's text via the contents API with the raw media type (no base64 JSON envelope).
+    Uses api.github.com rather than raw.githubusercontent.com, whose CDN can serve a branch's
+    file for minutes after a new commit.
+    Returns None if the file doesn't exist at that ref.
+    """
+    url = f"https://api.github.com/repos/{owner}/{repo}/contents/{quote(path)}"
+    headers = {**_auth_headers(), "Accept": "application/vnd.github.raw"}
+    response = _SESSION.get(url, headers=headers, params={"ref": ref}, timeout=30)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.content.decode("utf-8")
+
+def forget_missing_branch(owner, repo, branch):
+    """Drop a cached 'branch missing' probe result (call after creating the branch by other means)."""
+    _missing_branch_cache.pop((owner, repo, branch))
+
 def commit_files(owner, repo, branch, files, message, issue_key=None):
     """
     Commit multiple files to a branch. Creates branch if it doesn't exist.
-    files: dict of { "path/to/file": "content_string" }
+    files: dict of { "path/to/file": "content_string" or b"binary content" }
     """
     repository = get_repo(owner, repo)
     
     # 1. Get Base SHA (default branch) for new branches, or Current SHA for existing
     parent_sha = None
+    branch_ref = None
+    branch_exists = False
     default_branch = repository.default_branch
-    try:
-        branch_ref = repository.get_git_ref(f"heads/{branch}")
-        parent_sha = branch_ref.object.sha
-        logger.info(f"Branch '{branch}' exists. Appending to {parent_sha}")
-    except GithubException:
+    ref_key = (owner, repo, branch)
+    if ref_key not in _missing_branch_cache:
+        try:
+            branch_ref = repository.get_git_ref(f"heads/{branch}")
+            parent_sha = branch_ref.object.sha
+            branch_exists = True
+            logger.info(f"Branch '{branch}' exists. Appending to {parent_sha}")
+        except GithubException:
+            # Remember the miss so a retry within the window skips the 404 probe
+            _missing_branch_cache.set(ref_key, True)
+    if not branch_exists:
         # Branch doesn't exist, get default branch
         try:
             # Note: PyGithub requires "heads/" prefix, but default_branch is typically just "main" or "master"
@@ -87,33 +253,34 @@ def commit_files(owner, repo, branch, files, message, issue_key=None):
              logger.error(f"Cannot find default branch {default_branch}: {e}")
              raise
 
-    # 2. Create Blobs & Tree
+    # 2. Create Tree
+    # Text goes inline (GitHub creates the blobs server-side); bytes can't be sent inline,
+    # so binary files get a base64 blob and are referenced by SHA
     elements = []
     for path, content in files.items():
-        blob = repository.create_git_blob(content, "utf-8")
-        elements.append(InputGitTreeElement(path=path, mode="100644", type="blob", sha=blob.sha))
+        if isinstance(content, bytes):
+            blob = repository.create_git_blob(base64.b64encode(content).decode("ascii"), "base64")
+            elements.append(InputGitTreeElement(path=path, mode="100644", type="blob", sha=blob.sha))
+        else:
+            elements.append(InputGitTreeElement(path=path, mode="100644", type="blob", content=content))
     
-    base_tree = repository.get_git_tree(parent_sha)
-    tree = repository.create_git_tree(elements, base_tree=base_tree)
+    # The parent commit (needed for step 3 anyway) carries its tree SHA, so no separate get_git_tree
+    parent_commit = repository.get_git_commit(parent_sha)
+    tree = repository.create_git_tree(elements, base_tree=parent_commit.tree)
     
     # 3. Create Commit
-    parent_commit = repository.get_git_commit(parent_sha)
     commit = repository.create_git_commit(message, tree, [parent_commit])
     logger.info(f"Created commit {commit.sha}")
 
     # 4. Update Reference
-    try:
-        if branch_ref:
-            branch_ref.edit(sha=commit.sha)
-            logger.info(f"Updated branch {branch}")
-        else:
-            repository.create_git_ref(ref=f"refs/heads/{branch}", sha=commit.sha)
-            logger.info(f"Created branch {branch}")
-            
-    except UnboundLocalError:
-        # branch_ref was undefined, meaning we are creating a new branch
+    if branch_exists:
+        branch_ref.edit(sha=commit.sha)
+        logger.info(f"Updated branch {branch}")
+    else:
+        # New branch; a concurrent job may have created it since step 1
+        _missing_branch_cache.pop(ref_key)
         try:
-            repository.create_git_ref(ref=f"refs/heads/{branch}", sha=commit.sha)
+            branch_ref = repository.create_git_ref(ref=f"refs/heads/{branch}", sha=commit.sha)
             logger.info(f"Created branch {branch}")
         except GithubException as e:
             if e.status == 422:
@@ -161,16 +328,19 @@ def create_pull_request(owner, repo, branch, issue_key=None):
     repo_obj = get_repo(owner, repo)
     default_branch = repo_obj.default_branch
     
-    # Check for existing PR
-    pulls = repo_obj.get_pulls(state='open', head=f"{owner}:{branch}", base=default_branch)
-    for pr in pulls:
-        logger.info(f"Found existing PR #{pr.number} for {branch}")
-        if issue_key:
-            try:
-                pass 
-            except Exception:
-                pass
-        return {"pr_url": pr.html_url, "pr_number": pr.number, "is_new": False}
+    # Check for existing PR (one bounded request; at most one open PR per head/base)
+    response = _SESSION.get(
+        f"https://api.github.com/repos/{owner}/{repo}/pulls",
+        headers=_auth_headers(),
+        params={"state": "open", "head": f"{owner}:{branch}", "base": default_branch, "per_page": 1},
+        timeout=10,
+    )
+    response.raise_for_status()
+    existing = response.json()
+    if existing:
+        pr = existing[0]
+        logger.info(f"Found existing PR #{pr['number']} for {branch}")
+        return {"pr_url": pr["html_url"], "pr_number": pr["number"], "is_new": False}
 
     title = f"Copilot Fixes: {issue_key}" if issue_key else f"Copilot Automations ({branch})"
     body = f"Automated changes by Copilot Agent.\n\nRelated Issue: {issue_key}"
@@ -183,32 +353,36 @@ def create_pull_request(owner, repo, branch, issue_key=None):
     )
     logger.info(f"Created PR #{pr.number}: {pr.html_url}")
     
-    # Assign to Copilot & Add Labels (PRs are technically Issues in API)
-    try:
-        assign_issue_to_copilot(owner, repo, pr.number)
-        logger.info(f"Assigned @copilot to PR #{pr.number}")
-    except Exception as e:
-        logger.warning(f"Failed to assign @copilot to PR #{pr.number}: {e}")
+    # Assign to Copilot & Add Labels (PRs are technically Issues in API), and notify Jira.
+    # The calls are independent, so they run concurrently.
+    def assign():
+        try:
+            assign_issue_to_copilot(owner, repo, pr.number)
+            logger.info(f"Assigned @copilot to PR #{pr.number}")
+        except Exception as e:
+            logger.warning(f"Failed to assign @copilot to PR #{pr.number}: {e}")
 
-    try:
-        add_label_to_issue(owner, repo, pr.number, ["copilot", "jira-sync"])
-        logger.info(f"Added labels to PR #{pr.number}")
-    except Exception as e:
-        logger.warning(f"Failed to add labels to PR #{pr.number}: {e}")
+    def label():
+        try:
+            add_label_to_issue(owner, repo, pr.number, ["copilot", "jira-sync"])
+            logger.info(f"Added labels to PR #{pr.number}")
+        except Exception as e:
+            logger.warning(f"Failed to add labels to PR #{pr.number}: {e}")
 
-    if issue_key:
-         try:
+    def notify():
+        try:
             post_jira_comment(issue_key, f"Created Pull Request #{pr.number}", link_text="View PR", link_url=pr.html_url)
-         except Exception:
+        except Exception:
             pass
+
+    _run_concurrently([assign, label] + ([notify] if issue_key else []))
             
     return {"pr_url": pr.html_url, "pr_number": pr.number, "is_new": True}
 
 
 def post_pr_comment(owner, repo, pr_number, body):
     """Post a comment on a Pull Request (Issue)."""
-    g = _get_github_instance()
-    repository = g.get_repo(f"{owner}/{repo}")
+    repository = get_repo(owner, repo)
     issue = repository.get_issue(pr_number)
     comment = issue.create_comment(body)
     return {"comment_url": comment.html_url, "id": comment.id}
@@ -232,18 +406,22 @@ def create_copilot_issue(owner, repo, issue_key, summary, description):
     logger.info(f"Created Copilot issue #{issue.number}: {title}")
     
     # Try to assign copilot (requires PAT permissions)
-    try:
-        assign_issue_to_copilot(owner, repo, issue.number)
-        logger.info(f"Assigned @copilot to issue #{issue.number}")
-    except Exception as e:
-        logger.warning(f"Failed to assign @copilot to issue #{issue.number}: {e}")
+    def assign():
+        try:
+            assign_issue_to_copilot(owner, repo, issue.number)
+            logger.info(f"Assigned @copilot to issue #{issue.number}")
+        except Exception as e:
+            logger.warning(f"Failed to assign @copilot to issue #{issue.number}: {e}")
         
     # Add labels per reference implementation
-    try:
-        add_label_to_issue(owner, repo, issue.number, ["copilot", "jira-sync"])
-        logger.info(f"Added labels to issue #{issue.number}")
-    except Exception as e:
-         logger.warning(f"Failed to add labels to issue #{issue.number}: {e}")
+    def label():
+        try:
+            add_label_to_issue(owner, repo, issue.number, ["copilot", "jira-sync"])
+            logger.info(f"Added labels to issue #{issue.number}")
+        except Exception as e:
+            logger.warning(f"Failed to add labels to issue #{issue.number}: {e}")
+
+    _run_concurrently([assign, label])
 
     return {"issue_url": issue.html_url, "issue_number": issue.number}
 
@@ -252,21 +430,14 @@ def get_latest_workflow_run_for_ref(repo_name, ref):
     """
     Get the latest workflow run for a specific ref (branch or SHA).
     """
-    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
     url = f"https://api.github.com/repos/{repo_name}/actions/runs"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
     params = {
         "branch": ref,
         "per_page": 1,
     }
     
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = _conditional_get(f"{repo_name}:runs:{ref}", url, params=params)
         
         if data.get("workflow_runs"):
             return data["workflow_runs"][0]
@@ -280,17 +451,10 @@ def get_jobs_for_run(repo_name, run_id):
     """
     Get all jobs for a workflow run.
     """
-    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
     url = f"https://api.github.com/repos/{repo_name}/actions/runs/{run_id}/jobs"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
     
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = _conditional_get(f"{repo_name}:jobs:{run_id}", url)
         
         return data.get("jobs", [])
     except Exception as e:
@@ -298,61 +462,96 @@ def get_jobs_for_run(repo_name, run_id):
         return []
 
 
+_SUB_PR_SEARCH_QUERY = """
+query($q: String!, $cursor: String) {
+  search(query: $q, type: ISSUE, first: 100, after: $cursor) {
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on PullRequest {
+        id
+        number
+        url
+        title
+        body
+        isDraft
+        createdAt
+        author { login }
+        labels(first: 20) { nodes { name } }
+      }
+    }
+  }
+}
+"""
+
+
 def find_copilot_sub_pr(repo_name, main_pr_number):
     """
     Find a Copilot-created sub-PR that references the main PR.
+    A GraphQL search narrows to open PRs mentioning the number (paged, so every match is seen);
+    author and "#N" are then checked exactly, as before.
     """
     from copilot_agent.lib.config import COPILOT_USERNAME
     
-    owner, repo = repo_name.split("/")
-    repository = get_repo(owner, repo)
+    ref = f"#{main_pr_number}"
+    variables = {"q": f'repo:{repo_name} is:pr is:open in:body "{ref}"'}
     
     try:
-        # Get all open PRs
-        pulls = repository.get_pulls(state='open')
-        
-        for pr in pulls:
-            # Check if this is a Copilot PR (by author or title)
-            if pr.user and pr.user.login == COPILOT_USERNAME:
-                # Check if it references our main PR in body or title
-                if pr.body and f"#{main_pr_number}" in pr.body:
-                    return {
-                        "number": pr.number,
-                        "html_url": pr.html_url,
-                        "title": pr.title,
-                        "draft": pr.draft,
-                        "created_at": pr.created_at.isoformat() if pr.created_at else None,
-                        "labels": [{"name": label.name} for label in pr.labels],
-                    }
-        
-        return None
+        while True:
+            search = _graphql(_SUB_PR_SEARCH_QUERY, variables)["search"]
+            for pr in search["nodes"]:
+                if not pr:
+                    continue
+                # Check if this is a Copilot PR (by author)
+                if (pr.get("author") or {}).get("login") == COPILOT_USERNAME:
+                    # Check if it references our main PR in body
+                    if pr.get("body") and ref in pr["body"]:
+                        return {
+                            "number": pr["number"],
+                            "node_id": pr["id"],
+                            "html_url": pr["url"],
+                            "title": pr["title"],
+                            "draft": pr["isDraft"],
+                            "created_at": pr["createdAt"],
+                            "labels": [{"name": label["name"]} for label in pr["labels"]["nodes"]],
+                        }
+            if not search["pageInfo"]["hasNextPage"]:
+                return None
+            variables["cursor"] = search["pageInfo"]["endCursor"]
     except Exception as e:
         logger.warning(f"Failed to find Copilot sub-PR for {repo_name}#{main_pr_number}: {e}")
         return None
 
 
+def _get_pull(repo_name, pull_number):
+    """GET /repos/{repo}/pulls/{n} as JSON (one request, no repository lookup)."""
+    response = _SESSION.get(
+        f"https://api.github.com/repos/{repo_name}/pulls/{pull_number}",
+        headers=_auth_headers(),
+        timeout=10,
+    )
+    response.raise_for_status()
+    return response.json()
+
+
 def get_pull_request_details(repo_name, pull_number):
     """
     Get details of a specific pull request.
     """
-    owner, repo = repo_name.split("/")
-    repository = get_repo(owner, repo)
-    
     try:
-        pr = repository.get_pull(pull_number)
+        pr = _get_pull(repo_name, pull_number)
         return {
-            "number": pr.number,
-            "title": pr.title,
-            "state": pr.state,
-            "merged": pr.merged,
-            "draft": pr.draft,
-            "html_url": pr.html_url,
+            "number": pr["number"],
+            "title": pr["title"],
+            "state": pr["state"],
+            "merged": pr["merged"],
+            "draft": pr["draft"],
+            "html_url": pr["html_url"],
             "head": {
-                "ref": pr.head.ref,
-                "sha": pr.head.sha,
+                "ref": pr["head"]["ref"],
+                "sha": pr["head"]["sha"],
             },
             "base": {
-                "ref": pr.base.ref,
+                "ref": pr["base"]["ref"],
             }
         }
     except Exception as e:
@@ -364,12 +563,8 @@ def is_pull_request_merged(repo_name, pull_number):
     """
     Check if a pull request is merged.
     """
-    owner, repo = repo_name.split("/")
-    repository = get_repo(owner, repo)
-    
     try:
-        pr = repository.get_pull(pull_number)
-        return {"merged": pr.merged}
+        return {"merged": bool(_get_pull(repo_name, pull_number).get("merged"))}
     except Exception as e:
         logger.warning(f"Failed to check if PR is merged {repo_name}#{pull_number}: {e}")
         return {"merged": False}
@@ -379,16 +574,12 @@ def mark_pull_request_ready_for_review(repo_name, pull_number):
     """
     Mark a draft PR as ready for review.
     """
-    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
     url = f"https://api.github.com/repos/{repo_name}/pulls/{pull_number}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
+    headers = _auth_headers()
     data = {"draft": False}
     
     try:
-        response = requests.patch(url, headers=headers, json=data, timeout=10)
+        response = _SESSION.patch(url, headers=headers, json=data, timeout=10)
         response.raise_for_status()
         logger.info(f"Marked PR #{pull_number} as ready for review")
         return {"ok": True}
@@ -401,19 +592,15 @@ def approve_pull_request(repo_name, pull_number):
     """
     Approve a pull request.
     """
-    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
     url = f"https://api.github.com/repos/{repo_name}/pulls/{pull_number}/reviews"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-    }
+    headers = _auth_headers()
     data = {
         "event": "APPROVE",
         "body": "Auto-approved by Autopilot"
     }
     
     try:
-        response = requests.post(url, headers=headers, json=data, timeout=10)
+        response = _SESSION.post(url, headers=headers, json=data, timeout=10)
         response.raise_for_status()
         logger.info(f"Approved PR #{pull_number}")
         return {"ok": True}
@@ -422,30 +609,31 @@ def approve_pull_request(repo_name, pull_number):
         return {"ok": False, "error": str(e)}
 
 
+_PR_NODE_ID_QUERY = """
+query($owner: String!, $name: String!, $number: Int!) {
+  repository(owner: $owner, name: $name) { pullRequest(number: $number) { id } }
+}
+"""
+
+
+def _pull_request_node_id(repo_name, pull_number):
+    owner, repo = repo_name.split("/")
+    data = _graphql(_PR_NODE_ID_QUERY, {"owner": owner, "name": repo, "number": int(pull_number)})
+    return ((data.get("repository") or {}).get("pullRequest") or {}).get("id")
+
+
 def enable_pull_request_auto_merge(repo_name, pull_number, merge_method="SQUASH"):
     """
     Enable auto-merge for a pull request using GraphQL API.
     """
-    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
-    
-    # First get the PR node ID
-    owner, repo = repo_name.split("/")
-    repository = get_repo(owner, repo)
-    
     try:
-        pr = repository.get_pull(pull_number)
-        pr_node_id = pr.raw_data.get('node_id')
+        # First get the PR node ID (small GraphQL lookup instead of a full REST PR fetch)
+        pr_node_id = _pull_request_node_id(repo_name, pull_number)
         
         if not pr_node_id:
             return {"ok": False, "message": "Could not get PR node_id"}
         
         # Use GraphQL to enable auto-merge
-        graphql_url = "https://api.github.com/graphql"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
-        
         query = """
         mutation($pullRequestId: ID!, $mergeMethod: PullRequestMergeMethod!) {
           enablePullRequestAutoMerge(input: {
@@ -467,14 +655,7 @@ def enable_pull_request_auto_merge(repo_name, pull_number, merge_method="SQUASH"
             "mergeMethod": merge_method
         }
         
-        response = requests.post(
-            graphql_url,
-            headers=headers,
-            json={"query": query, "variables": variables},
-            timeout=10
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = _graphql_payload(query, variables)
         
         if "errors" in data:
             logger.warning(f"GraphQL errors enabling auto-merge: {data['errors']}")
@@ -488,68 +669,128 @@ def enable_pull_request_auto_merge(repo_name, pull_number, merge_method="SQUASH"
         return {"ok": False, "message": str(e)}
 
 
+def ship_pull_request(repo_name, pull_number, node_id=None, mark_ready=False, merge_method="SQUASH"):
+    """
+    Undraft (optional), approve and enable auto-merge for a PR in one GraphQL request
+    (plus one lookup if the PR node id isn't known). Mutations run in order, and one
+    failing doesn't stop the others.
+    Returns {"ready", "approved", "auto_merge"} booleans and an "errors" dict by step.
+    """
+    steps = (["ready"] if mark_ready else []) + ["approved", "auto_merge"]
+    try:
+        node_id = node_id or _pull_request_node_id(repo_name, pull_number)
+        if not node_id:
+            raise RuntimeError("Could not get PR node_id")
+
+        fields = []
+        if mark_ready:
+            fields.append("ready: markPullRequestReadyForReview(input: {pullRequestId: $id}) { clientMutationId }")
+        fields.append(
+            'approved: addPullRequestReview(input: {pullRequestId: $id, event: APPROVE, '
+            'body: "Auto-approved by Autopilot"}) { clientMutationId }'
+        )
+        fields.append(
+            "auto_merge: enablePullRequestAutoMerge(input: {pullRequestId: $id, mergeMethod: $method}) "
+            "{ clientMutationId }"
+        )
+        query = "mutation($id: ID!, $method: PullRequestMergeMethod!) {\n  " + "\n  ".join(fields) + "\n}"
+        payload = _graphql_payload(query, {"id": node_id, "method": merge_method})
+
+        errors = {}
+        for err in payload.get("errors") or []:
+            path = err.get("path") or []
+            # Errors without a path (e.g. validation) apply to the whole request
+            for step in ([path[0]] if path else steps):
+                errors[step] = err.get("message", str(err))
+        data = payload.get("data") or {}
+        result = {step: step not in errors and data.get(step) is not None for step in steps}
+    except Exception as e:
+        logger.warning(f"Failed to ship PR #{pull_number}: {e}")
+        errors = {step: str(e) for step in steps}
+        result = {step: False for step in steps}
+
+    result.setdefault("ready", not mark_ready)
+    result["errors"] = errors
+    logger.info(f"Shipped PR #{pull_number}: {result}")
+    return result
+
+
 def merge_pull_request(repo_name, pull_number, method="squash"):
     """
     Merge a pull request immediately.
     """
-    owner, repo = repo_name.split("/")
-    repository = get_repo(owner, repo)
+    url = f"https://api.github.com/repos/{repo_name}/pulls/{pull_number}/merge"
     
     try:
-        pr = repository.get_pull(pull_number)
-        result = pr.merge(merge_method=method)
+        response = _SESSION.put(url, headers=_auth_headers(), json={"merge_method": method}, timeout=10)
+        if response.status_code in (405, 409):
+            # Not mergeable / head changed: GitHub explains why in the body
+            message = response.json().get("message")
+            logger.warning(f"Failed to merge PR #{pull_number}: {message}")
+            return {"merged": False, "message": message}
+        response.raise_for_status()
+        result = response.json()
         
-        if result.merged:
+        if result.get("merged"):
             logger.info(f"Merged PR #{pull_number}")
             return {"merged": True}
         else:
-            logger.warning(f"Failed to merge PR #{pull_number}: {result.message}")
-            return {"merged": False, "message": result.message}
+            logger.warning(f"Failed to merge PR #{pull_number}: {result.get('message')}")
+            return {"merged": False, "message": result.get("message")}
             
     except Exception as e:
         logger.error(f"Failed to merge PR #{pull_number}: {e}")
         return {"merged": False, "message": str(e)}
 
 
+_OPEN_ORG_PRS_QUERY = """
+query($q: String!, $cursor: String) {
+  search(query: $q, type: ISSUE, first: 100, after: $cursor) {
+    pageInfo { endCursor hasNextPage }
+    nodes {
+      ... on PullRequest {
+        title
+        body
+        url
+        headRefName
+        headRefOid
+        repository { nameWithOwner }
+      }
+    }
+  }
+}
+"""
+
+
 def get_active_org_prs_with_jira_keys(org):
     """
     Get all open PRs in an organization that have Jira keys in their title or body.
+    Uses one GraphQL search per 100 PRs instead of listing every repo's pulls
+    (GitHub search returns at most 1000 results).
     """
-    import re
-    from copilot_agent.lib.config import JIRA_KEY_PATTERN
-    
-    token = os.getenv("GHUB_TOKEN") or os.getenv("GITHUB_TOKEN")
-    g = _get_github_instance()
-    
+    variables = {"q": f"org:{org} is:pr is:open", "cursor": None}
     active_prs = []
     
     try:
-        org_obj = g.get_organization(org)
-        repos = org_obj.get_repos()
-        
-        for repo in repos:
-            try:
-                pulls = repo.get_pulls(state='open')
-                
-                for pr in pulls:
-                    # Look for Jira keys using configurable pattern
-                    matches = []
-                    if pr.title:
-                        matches.extend(re.findall(JIRA_KEY_PATTERN, pr.title))
-                    if pr.body:
-                        matches.extend(re.findall(JIRA_KEY_PATTERN, pr.body))
-                    
-                    if matches:
-                        active_prs.append({
-                            "jiraKey": matches[0],  # Use first match
-                            "prUrl": pr.html_url,
-                            "repoName": repo.full_name,
-                            "branch": pr.head.ref,
-                            "headSha": pr.head.sha,
-                        })
-            except Exception as e:
-                logger.warning(f"Failed to get PRs for repo {repo.full_name}: {e}")
-                continue
+        while True:
+            search = _graphql(_OPEN_ORG_PRS_QUERY, variables)["search"]
+            for pr in search["nodes"]:
+                if not pr:
+                    continue
+                # Look for Jira keys using configurable pattern (one scan; title matches come first)
+                match = _JIRA_KEY_RE.search(f"{pr.get('title') or ''}\n{pr.get('body') or ''}")
+                if match:
+                    active_prs.append({
+                        "jiraKey": match.group(1) if match.groups() else match.group(0),
+                        "prUrl": pr["url"],
+                        "repoName": pr["repository"]["nameWithOwner"],
+                        "branch": pr["headRefName"],
+                        "headSha": pr["headRefOid"],
+                    })
+            page = search["pageInfo"]
+            if not page["hasNextPage"]:
+                break
+            variables["cursor"] = page["endCursor"]
         
         return active_prs
         
@@ -1,22 +1,82 @@
 import requests
-import json
+import io
 import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from copilot_agent.lib.logger import setup_logger
+from copilot_agent.lib.cache import TTLCache
+from copilot_agent.lib import json_utils
+from copilot_agent.lib.config import PRIORITY_ORDER, DEFAULT_PRIORITY_RANK
 
 logger = setup_logger("jira")
 
+# Shared session: keeps the TLS connection to the Jira host alive across calls.
+# Retries use urllib3's default idempotent-method list, so comment/transition POSTs are never replayed.
+_SESSION = requests.Session()
+_SESSION.headers.update({"Accept": "application/json"})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False),
+))
 
-def post_jira_comment(issue_key, text, link_text=None, link_url=None):
+# (connect, read) seconds for every Jira call, so a stalled host can't hang the poller
+JIRA_TIMEOUT = (3.05, 10)
+
+# Request bodies are serialized with json_utils (orjson when available) and sent as data=
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# Fixed ADF scaffold of a one-paragraph comment: {"body": {"type": "doc", ..., "content": [<paragraph>]}}
+_ADF_COMMENT_PREFIX = b'{"body":{"type":"doc","version":1,"content":[{"type":"paragraph","content":'
+_ADF_COMMENT_SUFFIX = b'}]}}'
+
+# Short-lived read caches so the poller and watchdog don't refetch the same issue within a cycle
+_issue_details_cache = TTLCache(maxsize=256, ttl=30)
+_issue_comments_cache = TTLCache(maxsize=256, ttl=30)
+# (jql, max_results) -> shaped results; dropped whenever an issue is modified (see invalidate_issue)
+_search_cache = TTLCache(maxsize=128, ttl=30)
+# Transition ids are only unique within one workflow, and the workflow is chosen by (project, issue type).
+# issue key -> issue type id, recorded for free from search/details responses
+_issue_type_cache = TTLCache(maxsize=1024, ttl=300)
+# (project key, issue type id, lowercased transition name) -> transition id; workflows rarely change
+_transition_cache = TTLCache(maxsize=256, ttl=300)
+
+
+JiraConfig = namedtuple("JiraConfig", "base_url auth")
+
+
+@lru_cache(maxsize=1)
+def _jira_config():
+    """Resolve Jira connection settings once (call _jira_config.cache_clear() after changing env)."""
     base_url = os.getenv('JIRA_BASE_URL')
     user_email = os.getenv('JIRA_USER_EMAIL')
     api_token = os.getenv('JIRA_API_TOKEN')
-
     if not base_url or not user_email or not api_token:
         raise RuntimeError("Jira environment variables are not set: JIRA_BASE_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN")
+    return JiraConfig(base_url, (user_email, api_token))
+
 
-    url = f"{base_url}/rest/api/3/issue/{issue_key}/comment"
-    auth = (user_email, api_token)
-    headers = {"Content-Type": "application/json"}
+def _remember_issue_type(issue_key, fields):
+    """Record an issue's type id (from a response that already carries it) for the transition cache."""
+    issue_type = (fields.get("issuetype") or {}).get("id")
+    if issue_key and issue_type:
+        _issue_type_cache.set(issue_key, issue_type)
+
+
+def invalidate_issue(issue_key):
+    """Drop cached details/comments for an issue (and cached searches) after it has been modified."""
+    _issue_details_cache.pop(issue_key)
+    _issue_comments_cache.pop(issue_key)
+    # Any change (e.g. a transition) can move the issue in or out of a cached JQL result
+    _search_cache.clear()
+
+
+def post_jira_comment(issue_key, text, link_text=None, link_url=None):
+    cfg = _jira_config()
+
+    url = f"{cfg.base_url}/rest/api/3/issue/{issue_key}/comment"
 
     # Construct ADF paragraph content
     paragraph_content = [{"type": "text", "text": text}]
@@ -32,21 +92,11 @@ def post_jira_comment(issue_key, text, link_text=None, link_url=None):
             "marks": [{"type": "link", "attrs": {"href": link_url}}]
         })
 
-    # Use Atlassian Document Format to avoid 400s on strict Jira setups
-    payload = {
-        "body": {
-            "type": "doc",
-            "version": 1,
-            "content": [
-                {
-                    "type": "paragraph",
-                    "content": paragraph_content
-                }
-            ]
-        }
-    }
+    # Use Atlassian Document Format to avoid 400s on strict Jira setups; only the paragraph is encoded per call
+    body = _ADF_COMMENT_PREFIX + json_utils.dumps(paragraph_content) + _ADF_COMMENT_SUFFIX
 
-    resp = requests.post(url, json=payload, auth=auth, headers=headers)
+    resp = _SESSION.post(url, data=body, headers=_JSON_HEADERS, auth=cfg.auth, timeout=JIRA_TIMEOUT)
+    invalidate_issue(issue_key)
     try:
         resp.raise_for_status()
         logger.info(f"Posted comment to {issue_key}: {text[:50]}...")
@@ -56,41 +106,76 @@ def post_jira_comment(issue_key, text, link_text=None, link_url=None):
         raise requests.HTTPError(f"Jira comment failed: {resp.status_code} {resp.text}") from e
 
 
+BULK_COMMENT_WORKERS = 10
+
+
+def post_jira_comments_bulk(items):
+    """
+    Post comments to several issues at once over the pooled session.
+    items: iterable of (issue_key, text[, link_text, link_url]) tuples.
+    Returns {issue_key: exception} for the posts that failed (empty when all succeeded).
+    """
+    items = list(items)
+    failures = {}
+    if not items:
+        return failures
+    with ThreadPoolExecutor(max_workers=min(BULK_COMMENT_WORKERS, len(items))) as ex:
+        futures = [(item[0], ex.submit(post_jira_comment, *item)) for item in items]
+        for issue_key, future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                failures[issue_key] = e
+    return failures
+
+
 def get_transitions(issue_key):
     """Return available transitions for an issue with id and name."""
-    base_url = os.getenv('JIRA_BASE_URL')
-    user_email = os.getenv('JIRA_USER_EMAIL')
-    api_token = os.getenv('JIRA_API_TOKEN')
-    if not base_url or not user_email or not api_token:
-        raise RuntimeError("Jira environment variables are not set: JIRA_BASE_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN")
+    cfg = _jira_config()
 
-    url = f"{base_url}/rest/api/3/issue/{issue_key}/transitions"
-    auth = (user_email, api_token)
-    headers = {"Accept": "application/json"}
-    resp = requests.get(url, auth=auth, headers=headers)
+    url = f"{cfg.base_url}/rest/api/3/issue/{issue_key}/transitions"
+    resp = _SESSION.get(url, auth=cfg.auth, timeout=JIRA_TIMEOUT)
     try:
         resp.raise_for_status()
     except requests.HTTPError as e:
         raise requests.HTTPError(f"Jira get transitions failed: {resp.status_code} {resp.text}") from e
-    data = resp.json()
+    data = json_utils.loads(resp.content)
     return [{"id": t.get("id"), "name": t.get("name")} for t in data.get("transitions", [])]
 
 
+def _post_transition(cfg, issue_key, transition_id):
+    url = f"{cfg.base_url}/rest/api/3/issue/{issue_key}/transitions"
+    payload = {"transition": {"id": transition_id}}
+    return _SESSION.post(url, data=json_utils.dumps(payload), headers=_JSON_HEADERS, auth=cfg.auth, timeout=JIRA_TIMEOUT)
+
+
 def transition_issue(issue_key, target_status_name):
     """Transition an issue to a target status by name."""
-    transitions = get_transitions(issue_key)
-    match = next((t for t in transitions if (t.get("name") or "").lower() == target_status_name.lower()), None)
-    if not match:
-        raise ValueError(f"No transition named '{target_status_name}' available for issue {issue_key}. Available: {[t['name'] for t in transitions]}")
+    cfg = _jira_config()
+    project = issue_key.split("-")[0]
+    # Without a known issue type we can't tell which workflow applies, so don't trust the cache
+    issue_type = _issue_type_cache.get(issue_key)
+    transition_id = _transition_cache.get((project, issue_type, target_status_name.lower())) if issue_type else None
+    resp = None
+    if transition_id is not None:
+        # Known id for this project's workflow: skip the GET /transitions pre-flight
+        resp = _post_transition(cfg, issue_key, transition_id)
+        if resp.status_code in (400, 404):
+            # Not available from the issue's current status (or stale); look it up properly
+            resp = None
 
-    base_url = os.getenv('JIRA_BASE_URL')
-    user_email = os.getenv('JIRA_USER_EMAIL')
-    api_token = os.getenv('JIRA_API_TOKEN')
-    url = f"{base_url}/rest/api/3/issue/{issue_key}/transitions"
-    auth = (user_email, api_token)
-    headers = {"Content-Type": "application/json"}
-    payload = {"transition": {"id": match["id"]}}
-    resp = requests.post(url, json=payload, auth=auth, headers=headers)
+    if resp is None:
+        transitions = get_transitions(issue_key)
+        if issue_type:
+            for t in transitions:
+                if t.get("name") and t.get("id"):
+                    _transition_cache.set((project, issue_type, t["name"].lower()), t["id"])
+        match = next((t for t in transitions if (t.get("name") or "").lower() == target_status_name.lower()), None)
+        if not match:
+            raise ValueError(f"No transition named '{target_status_name}' available for issue {issue_key}. Available: {[t['name'] for t in transitions]}")
+        resp = _post_transition(cfg, issue_key, match["id"])
+
+    invalidate_issue(issue_key)
     try:
         resp.raise_for_status()
     except requests.HTTPError as e:
@@ -98,97 +183,151 @@ def transition_issue(issue_key, target_status_name):
     return {"issueKey": issue_key, "status": target_status_name}
 
 
+# ADF inline nodes; every other node type (paragraph, codeBlock, panel, listItem, ...) is a block
+_ADF_INLINE_TYPES = frozenset({"text", "hardBreak", "mention", "emoji", "date", "status", "inlineCard", "mediaInline"})
+
+
+def _adf_text(node, out):
+    """Write the text of an ADF tree to `out`, starting each block on its own line (iterative DFS)."""
+    stack = [node]
+    at_line_start = True
+    while stack:
+        n = stack.pop()
+        if not isinstance(n, dict):
+            continue
+        node_type = n.get("type")
+        if node_type == "text":
+            text = n.get("text", "")
+            if text:
+                out.write(text)
+                at_line_start = text.endswith("\n")
+        elif node_type == "hardBreak":
+            out.write("\n")
+            at_line_start = True
+        elif node_type not in _ADF_INLINE_TYPES and not at_line_start:
+            # Nested blocks (list > listItem > paragraph) share one line break
+            out.write("\n")
+            at_line_start = True
+        stack.extend(reversed(n.get("content", [])))
+
+
 def get_issue_details(issue_key):
-    """Fetch Jira issue summary and description."""
-    base_url = os.getenv('JIRA_BASE_URL')
-    user_email = os.getenv('JIRA_USER_EMAIL')
-    api_token = os.getenv('JIRA_API_TOKEN')
-    if not base_url or not user_email or not api_token:
-        raise RuntimeError("Jira environment variables are not set: JIRA_BASE_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN")
+    """Fetch Jira issue summary and description (cached for a few seconds)."""
+    cached = _issue_details_cache.get(issue_key)
+    if cached is not None:
+        return cached
 
-    url = f"{base_url}/rest/api/3/issue/{issue_key}"
-    auth = (user_email, api_token)
-    headers = {"Accept": "application/json"}
-    resp = requests.get(url, auth=auth, headers=headers)
+    cfg = _jira_config()
+
+    url = f"{cfg.base_url}/rest/api/3/issue/{issue_key}"
+    # Only the fields we read; otherwise Jira serializes every (custom) field on the issue
+    resp = _SESSION.get(url, params={"fields": "summary,description,issuetype"}, auth=cfg.auth, timeout=JIRA_TIMEOUT)
     try:
         resp.raise_for_status()
     except requests.HTTPError as e:
         raise requests.HTTPError(f"Jira issue fetch failed: {resp.status_code} {resp.text}") from e
-    data = resp.json()
+    data = json_utils.loads(resp.content)
     fields = data.get("fields", {})
+    _remember_issue_type(issue_key, fields)
     summary = fields.get("summary")
     description = fields.get("description")
-    # Description may be in ADF; flatten simple text when possible
+    # Description may be in ADF; flatten text at any nesting depth
     desc_text = None
     if isinstance(description, dict) and description.get("content"):
-        try:
-            parts = []
-            for block in description.get("content", []):
-                for item in block.get("content", []):
-                    if item.get("text"):
-                        parts.append(item["text"])
-            desc_text = "\n".join(parts) if parts else None
-        except Exception:
-            desc_text = None
+        buf = io.StringIO()
+        _adf_text(description, buf)
+        desc_text = buf.getvalue().strip() or None
     elif isinstance(description, str):
         desc_text = description
-    return {"summary": summary, "description": desc_text}
+    details = {"summary": summary, "description": desc_text}
+    _issue_details_cache.set(issue_key, details)
+    return details
 
 
-def search_issues(jql: str, max_results: int = 20):
-    """Search Jira issues using the standard /rest/api/3/search endpoint."""
-    base_url = os.getenv('JIRA_BASE_URL')
-    user_email = os.getenv('JIRA_USER_EMAIL')
-    api_token = os.getenv('JIRA_API_TOKEN')
-    if not base_url or not user_email or not api_token:
-        raise RuntimeError("Jira environment variables are not set: JIRA_BASE_URL, JIRA_USER_EMAIL, JIRA_API_TOKEN")
+SEARCH_PAGE_SIZE = 100
+
 
+def _search_page(cfg, jql, max_results, next_page_token=None):
+    """POST one page of /rest/api/3/search/jql; returns (issues, nextPageToken)."""
     # Migrate to the new JQL search endpoint per Atlassian CHANGE-2046
-    url = f"{base_url}/rest/api/3/search/jql"
-    auth = (user_email, api_token)
-    headers = {"Content-Type": "application/json", "Accept": "application/json"}
-    
+    url = f"{cfg.base_url}/rest/api/3/search/jql"
     payload = {
         "jql": jql,
         "maxResults": max_results,
-        "fields": ["summary", "status", "priority", "assignee"]
+        "fields": ["summary", "status", "priority", "assignee", "issuetype"]
     }
-    resp = requests.post(url, json=payload, auth=auth, headers=headers)
+    if next_page_token:
+        payload["nextPageToken"] = next_page_token
+    resp = _SESSION.post(url, data=json_utils.dumps(payload), headers=_JSON_HEADERS, auth=cfg.auth, timeout=JIRA_TIMEOUT)
     try:
         resp.raise_for_status()
     except requests.HTTPError as e:
         raise requests.HTTPError(f"Jira search failed: {resp.status_code} {resp.text}") from e
+    data = json_utils.loads(resp.content)
+    return data.get("issues", []), data.get("nextPageToken")
+
+
+def _issue_summary(cfg, i):
+    f = i.get("fields", {})
+    _remember_issue_type(i.get("key"), f)
+    priority = (f.get("priority") or {}).get("name")
+    return {
+        "key": i.get("key"),
+        "summary": f.get("summary"),
+        "status": (f.get("status") or {}).get("name"),
+        "priority": priority,
+        # Numeric rank (0 = Highest) so callers can sort without re-mapping names
+        "_prio": PRIORITY_ORDER.get(priority or "Medium", DEFAULT_PRIORITY_RANK),
+        "assignee": (f.get("assignee") or {}).get("displayName"),
+        "url": f"{cfg.base_url}/browse/{i.get('key')}"
+    }
+
+
+def search_issues(jql: str, max_results: int = 20):
+    """Search Jira issues (single page) using the /rest/api/3/search/jql endpoint (cached for a few seconds)."""
+    cached = _search_cache.get((jql, max_results))
+    if cached is not None:
+        return list(cached)
+
+    cfg = _jira_config()
+    issues, _ = _search_page(cfg, jql, max_results)
+    out = [_issue_summary(cfg, i) for i in issues]
+    _search_cache.set((jql, max_results), out)
+    return list(out)
+
+
+def search_issues_paged(jql: str, total: int):
+    """
+    Search Jira issues across pages of SEARCH_PAGE_SIZE until `total` results or the last page.
+    /search/jql pages by opaque nextPageToken, so pages are fetched in order over the shared session.
+    """
+    cfg = _jira_config()
     out = []
-    for i in resp.json().get("issues", []):
-        f = i.get("fields", {})
-        out.append({
-            "key": i.get("key"),
-            "summary": f.get("summary"),
-            "status": (f.get("status") or {}).get("name"),
-            "priority": (f.get("priority") or {}).get("name"),
-            "assignee": (f.get("assignee") or {}).get("displayName"),
-            "url": f"{base_url}/browse/{i.get('key')}"
-        })
-    return out
+    token = None
+    while len(out) < total:
+        issues, token = _search_page(cfg, jql, min(SEARCH_PAGE_SIZE, total - len(out)), token)
+        out.extend(_issue_summary(cfg, i) for i in issues)
+        if not token or not issues:
+            break
+    return out[:total]
 
 def get_issue_comments(issue_key):
-    """Fetch comments for an issue."""
-    base_url = os.getenv('JIRA_BASE_URL')
-    user_email = os.getenv('JIRA_USER_EMAIL')
-    api_token = os.getenv('JIRA_API_TOKEN')
-    
-    url = f"{base_url}/rest/api/3/issue/{issue_key}/comment"
-    auth = (user_email, api_token)
-    headers = {"Accept": "application/json"}
+    """Fetch comments for an issue (cached for a few seconds)."""
+    cached = _issue_comments_cache.get(issue_key)
+    if cached is not None:
+        return cached
+
+    cfg = _jira_config()
+    url = f"{cfg.base_url}/rest/api/3/issue/{issue_key}/comment"
     
-    resp = requests.get(url, auth=auth, headers=headers)
+    resp = _SESSION.get(url, auth=cfg.auth, timeout=JIRA_TIMEOUT)
     try:
         resp.raise_for_status()
     except requests.HTTPError:
         return []
         
     comments = []
-    for c in resp.json().get("comments", []):
+    for c in json_utils.loads(resp.content).get("comments", []):
         # Parse body (ADF or string) - simplified text extraction
         body = c.get("body")
         text = ""
@@ -215,4 +354,5 @@ def get_issue_comments(issue_key):
             "author": (c.get("author") or {}).get("displayName"),
             "body": text
         })
+    _issue_comments_cache.set(issue_key, comments)
     return comments
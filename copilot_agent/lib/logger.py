@@ -1,41 +1,71 @@
+import atexit
 import logging
 import os
+import queue
 import sys
 from datetime import datetime
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logger(name):
-    """
-    Sets up a logger that matches the user's requirement:
-    - Writes to a log file in logs/ directory (one file per run).
-    - Writes to console.
-    """
+# Names already given handlers; repeat calls just return the logger
+_CONFIGURED = set()
+_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+@lru_cache(maxsize=1)
+def _log_file_path():
+    """Resolve the run's log file once (resolved lazily so a loaded .env can set COPILOT_AGENT_LOG_FILE)."""
     # Determine log directory (copilot_agent/logs)
     # This assumes lib/logger.py is in copilot_agent/lib/
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     log_dir = os.path.join(base_dir, 'logs')
-    os.makedirs(log_dir, exist_ok=True)
 
     # Use environment variable for unified log file if set, otherwise generate timestamped name
     log_file_path = os.getenv('COPILOT_AGENT_LOG_FILE')
     if not log_file_path:
+        os.makedirs(log_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
         filename = f"agent-{timestamp}.log"
         log_file_path = os.path.join(log_dir, filename)
+    return log_file_path
+
 
+@lru_cache(maxsize=1)
+def _file_queue_handler(formatter):
+    """
+    One QueueHandler shared by every logger; a background QueueListener does the actual file writes,
+    so log calls on the request path only enqueue the record.
+    """
+    file_handler = logging.FileHandler(_log_file_path(), mode='a', encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    # Drain pending records and close the file on interpreter exit
+    atexit.register(listener.stop)
+    return QueueHandler(log_queue)
+
+
+def setup_logger(name):
+    """
+    Sets up a logger that matches the user's requirement:
+    - Writes to a log file in logs/ directory (one file per run).
+    - Writes to console.
+    """
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+    if name in _CONFIGURED:
+        return logger
+    _CONFIGURED.add(name)
 
-    # Prevent adding duplicate handlers if setup_logger is called multiple times for same name
-    if logger.hasHandlers():
-        logger.handlers.clear()
+    logger.setLevel(logging.INFO)
+    # Our handlers are complete; don't also pass records up to the root logger's handlers
+    logger.propagate = False
 
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    formatter = _FORMATTER
 
-    # 1. File Handler
+    # 1. File Handler (written off-thread via the shared queue)
     try:
-        file_handler = logging.FileHandler(log_file_path, mode='a', encoding='utf-8')
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        logger.addHandler(_file_queue_handler(formatter))
     except Exception as e:
         print(f"Failed to setup file logging: {e}")
 
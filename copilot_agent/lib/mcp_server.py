@@ -1,6 +1,10 @@
 from mcp.server.fastmcp import FastMCP
 import subprocess
 import os
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 from copilot_agent.lib.logger import setup_logger
 
@@ -11,6 +15,57 @@ mcp = FastMCP("my-mcp-server")
 
 # Security: Whitelist allowed paths
 ALLOWED_REPOS = [p.strip() for p in os.environ.get("ALLOWED_REPOS", "").split(",") if p.strip()]
+# Normalized once at import instead of on every tool call. The trailing separator keeps
+# /repos/app from also admitting /repos/app-secrets. A single C-level startswith(tuple) beats a
+# prefix trie for the handful of entries ALLOWED_REPOS holds; with dozens of entries, checking each
+# ancestor of the target against a set of the exact paths would be the O(depth) alternative.
+_ALLOWED_EXACT = tuple(os.path.normcase(os.path.abspath(p)) for p in ALLOWED_REPOS)
+_ALLOWED_PREFIXES = tuple(p.rstrip(os.sep) + os.sep for p in _ALLOWED_EXACT)
+
+
+def _is_allowed(repo_path: str) -> bool:
+    """True if repo_path is one of the ALLOWED_REPOS entries or lies beneath one."""
+    target = os.path.normcase(os.path.abspath(repo_path))
+    return target in _ALLOWED_EXACT or target.startswith(_ALLOWED_PREFIXES)
+
+
+# Static GitHub Pages workflow (infra.py was removed); encoded once at import
+_PAGES_WORKFLOW_YAML_BYTES = b"""name: Deploy to GitHub Pages
+
+on:
+  push:
+    branches: ["main"]
+  workflow_dispatch:
+
+permissions:
+  contents: read
+  pages: write
+  id-token: write
+
+concurrency:
+  group: "pages"
+  cancel-in-progress: false
+
+jobs:
+  deploy:
+    environment:
+      name: github-pages
+      url: ${{ steps.deployment.outputs.page_url }}
+    runs-on: ubuntu-latest
+    steps:
+      - name: Checkout
+        uses: actions/checkout@v4
+      - name: Setup Pages
+        uses: actions/configure-pages@v5
+      - name: Upload artifact
+        uses: actions/upload-pages-artifact@v3
+        with:
+          path: '.'
+      - name: Deploy to GitHub Pages
+        id: deployment
+        uses: actions/deploy-pages@v4
+"""
+
 
 @mcp.tool()
 def agent_tests(repo_path: str) -> dict:
@@ -22,8 +77,7 @@ def agent_tests(repo_path: str) -> dict:
     # ---------------------------------------------------------
     # SECURITY: Whitelist Enforcement
     # ---------------------------------------------------------
-    normalized_repo = os.path.normpath(repo_path)
-    if not any(normalized_repo.startswith(os.path.normpath(allowed.strip())) for allowed in ALLOWED_REPOS if allowed.strip()):
+    if not _is_allowed(repo_path):
         logger.warning(f"Access denied for path: {repo_path}")
         return {
             "status": "PERMISSION_DENIED", 
@@ -49,43 +103,69 @@ def agent_tests(repo_path: str) -> dict:
         ["bandit", "-r", "."]
     ]
     
-    results = []
-    failed = False
-    
-    for cmd in commands:
-        try:
-            # Using subprocess.run with cwd argument is safer than os.chdir
-            # which affects the whole process
-            result = subprocess.run(
-                cmd, 
-                cwd=repo_path,
-                capture_output=True, 
-                text=True,
-                check=False
-            )
-            
-            results.append({
+    procs = {}
+    killed = set()
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def stop_all():
+        # Fail-fast: terminate checks still running; they are left out of the report
+        with lock:
+            stop.set()
+            for key, proc in procs.items():
+                if proc.poll() is None:
+                    proc.terminate()
+                    killed.add(key)
+
+    def run(cmd):
+        # Output goes to temp files rather than pipes so a huge pytest log isn't held in memory while running
+        with tempfile.TemporaryFile(mode="w+") as out, tempfile.TemporaryFile(mode="w+") as err:
+            with lock:
+                if stop.is_set():
+                    return None
+                proc = subprocess.Popen(cmd, cwd=repo_path, stdout=out, stderr=err, text=True)
+                procs[tuple(cmd)] = proc
+            returncode = proc.wait()
+            with lock:
+                if tuple(cmd) in killed:
+                    return None
+            out.seek(0)
+            err.seek(0)
+            return {
                 "command": " ".join(cmd),
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "returncode": result.returncode
-            })
-            
-            if result.returncode != 0:
-                failed = True
-                # The user's original logic returned early on failure.
-                # We will preserve that behavior.
-                return {
-                    "status": "FAILED",
-                    "details": results
-                }
-                
-        except Exception as e:
-             return {
-                "status": "ERROR",
-                "details": str(e)
+                "stdout": out.read(),
+                "stderr": err.read(),
+                "returncode": returncode
             }
 
+    # The three checks are independent, so run them side by side
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=len(commands)) as ex:
+            futures = [ex.submit(run, cmd) for cmd in commands]
+            for fut in as_completed(futures):
+                result = fut.result()
+                if result is None:
+                    continue
+                results.append(result)
+                if result["returncode"] != 0 and not stop.is_set():
+                    # Preserve the fail-fast behaviour: stop the checks still running
+                    stop_all()
+    except Exception as e:
+        stop_all()
+        return {
+            "status": "ERROR",
+            "details": str(e)
+        }
+
+    order = {" ".join(cmd): n for n, cmd in enumerate(commands)}
+    results.sort(key=lambda r: order[r["command"]])
+    if stop.is_set():
+        return {
+            "status": "FAILED",
+            "details": results
+        }
+
     return {
         "status": "PASSED",
         "details": results
@@ -101,8 +181,7 @@ def setup_pages(repo_path: str, project_type: str = "html") -> dict:
     # ---------------------------------------------------------
     # SECURITY: Whitelist Enforcement
     # ---------------------------------------------------------
-    normalized_repo = os.path.normpath(repo_path)
-    if not any(normalized_repo.startswith(os.path.normpath(allowed.strip())) for allowed in ALLOWED_REPOS if allowed.strip()):
+    if not _is_allowed(repo_path):
         logger.warning(f"Access denied for setup_pages on path: {repo_path}")
         return {
             "status": "PERMISSION_DENIED",
@@ -115,46 +194,8 @@ def setup_pages(repo_path: str, project_type: str = "html") -> dict:
         workflows_dir = os.path.join(repo_path, ".github", "workflows")
         os.makedirs(workflows_dir, exist_ok=True)
         
-        # Inline generation (infra.py was removed)
-        workflow_content = """name: Deploy to GitHub Pages
-
-on:
-  push:
-    branches: ["main"]
-  workflow_dispatch:
-
-permissions:
-  contents: read
-  pages: write
-  id-token: write
-
-concurrency:
-  group: "pages"
-  cancel-in-progress: false
-
-jobs:
-  deploy:
-    environment:
-      name: github-pages
-      url: ${{ steps.deployment.outputs.page_url }}
-    runs-on: ubuntu-latest
-    steps:
-      - name: Checkout
-        uses: actions/checkout@v4
-      - name: Setup Pages
-        uses: actions/configure-pages@v5
-      - name: Upload artifact
-        uses: actions/upload-pages-artifact@v3
-        with:
-          path: '.'
-      - name: Deploy to GitHub Pages
-        id: deployment
-        uses: actions/deploy-pages@v4
-"""
         target_file = os.path.join(workflows_dir, "pages.yml")
-        
-        with open(target_file, "w") as f:
-            f.write(workflow_content)
+        Path(target_file).write_bytes(_PAGES_WORKFLOW_YAML_BYTES)
             
         return {
             "status": "SUCCESS",
@@ -0,0 +1,46 @@
+"""
+Find/replace helpers shared by the autofix endpoint and the agent worker script.
+"""
+import re
+from collections import defaultdict
+
+# "key=value" pairs in change instructions, e.g. "path=app.py, find=foo, replace=bar"
+_INSTR_RE = re.compile(r'(\w+)\s*=\s*([^,]*)')
+
+
+def parse_change_instructions(text):
+    """Parse "path=..., find=..., replace=..." lines into change dicts; other lines are skipped."""
+    changes = []
+    for line in text.splitlines():
+        # Cheap reject before running the regex: an instruction needs at least path/find/replace
+        if line.count("=") < 3:
+            continue
+        entry = {k: v.strip() for k, v in _INSTR_RE.findall(line)}
+        if entry.get("path") and "find" in entry and "replace" in entry:
+            changes.append({"path": entry["path"], "find": entry["find"], "replace": entry["replace"]})
+    return changes
+
+
+def group_changes_by_path(changes):
+    """Group change dicts ({"path", "find", "replace"}) into {path: {find: replace}}, keeping order."""
+    by_path = defaultdict(dict)
+    for ch in changes:
+        by_path[ch["path"]][ch.get("find", "")] = ch.get("replace", "")
+    return dict(by_path)
+
+
+def apply_replacements(content, replacements):
+    """
+    Apply every find -> replace pair in `replacements` to `content` in a single scan.
+    Longer find strings win when several match at the same position; empty finds are ignored.
+    Works on str or bytes, as long as content and replacements use the same type.
+    """
+    mapping = {find: repl for find, repl in replacements.items() if find}
+    if not mapping:
+        return content
+    if len(mapping) == 1:
+        (find, repl), = mapping.items()
+        return content.replace(find, repl)
+    sep = b"|" if isinstance(content, bytes) else "|"
+    pattern = re.compile(sep.join(re.escape(f) for f in sorted(mapping, key=len, reverse=True)))
+    return pattern.sub(lambda m: mapping[m.group(0)], content)
@@ -1,3 +1,7 @@
+from functools import lru_cache
+from string import Template
+
+
 def generate_dockerfile(language):
     """Generate a default Dockerfile for the language."""
     language = (language or '').lower()
@@ -51,50 +55,33 @@ COPY . .
 CMD ["echo", "No run command configured"]
 """
 
-def generate_workflow(repo, language, build_cmd, test_cmd, deploy_target):
-    repo_name = repo.split('/')[1] if '/' in repo else repo
-    
-    # Analyze Payload to determine defaults if commands are placeholders/empty
-    language = (language or '').lower()
-    
-    # Default to GitHub Pages if not specified
-    deploy_target = deploy_target or "github-pages"
-    
-    defaults = {
-        'python': {
-            'build': "echo 'No build necessary for Python'",
-            'test': "pytest || echo 'No tests found'" 
-        },
-        'node': {
-            'build': "npm run build --if-present",
-            'test': "npm test || echo 'No tests found'"
-        },
-        'dotnet': {
-            'build': "dotnet build",
-            'test': "dotnet test"
-        },
-        'java': {
-            'build': "mvn package -DskipTests",
-            'test': "mvn test"
-        }
+_DEFAULT_COMMANDS = {
+    'python': {
+        'build': "echo 'No build necessary for Python'",
+        'test': "pytest || echo 'No tests found'" 
+    },
+    'node': {
+        'build': "npm run build --if-present",
+        'test': "npm test || echo 'No tests found'"
+    },
+    'dotnet': {
+        'build': "dotnet build",
+        'test': "dotnet test"
+    },
+    'java': {
+        'build': "mvn package -DskipTests",
+        'test': "mvn test"
     }
-    
-    # Map synonyms
-    if language in ['javascript', 'typescript', 'js', 'ts']:
-        lang_key = 'node'
-    elif language in ['c#', 'csharp']:
-        lang_key = 'dotnet'
-    elif language in ['maven', 'gradle']:
-        lang_key = 'java'
-    else:
-        lang_key = language if language in defaults else 'python' # Default to python if unknown
+}
 
-    # Resolve commands: Use provided CMD if valid, else default
-    real_build_cmd = build_cmd if build_cmd and "{" not in build_cmd else defaults[lang_key]['build']
-    real_test_cmd = test_cmd if test_cmd and "{" not in test_cmd else defaults[lang_key]['test']
+# Synonyms -> keys of _DEFAULT_COMMANDS / _SETUP_BY_LANG
+_LANG_ALIAS = {
+    'javascript': 'node', 'typescript': 'node', 'js': 'node', 'ts': 'node',
+    'c#': 'dotnet', 'csharp': 'dotnet',
+    'maven': 'java', 'gradle': 'java',
+}
 
-    # Generate Header
-    header = f"""name: CI/CD Pipeline
+_WORKFLOW_HEADER = """name: CI/CD Pipeline
 
 on:
   push:
@@ -119,10 +106,9 @@ jobs:
       - uses: actions/checkout@v4
 """
 
-    # Language Specific Setup
-    setup = ""
-    if lang_key == 'node':
-        setup = """
+# Language Specific Setup
+_SETUP_BY_LANG = {
+    'node': """
       - name: Setup Node.js
         uses: actions/setup-node@v4
         with:
@@ -131,13 +117,14 @@ jobs:
         uses: actions/cache@v3
         with:
           path: ~/.npm
-          key: ${{ runner.os }}-node-${{ hashFiles('**/package-lock.json') }}
-          restore-keys: ${{ runner.os }}-node-
+          key: ${{ runner.os }}-node-18-${{ hashFiles('**/package-lock.json') }}
+          restore-keys: |
+            ${{ runner.os }}-node-18-
+            ${{ runner.os }}-node-
       - name: Install dependencies
         run: npm ci || npm install
-"""
-    elif lang_key == 'python':
-        setup = """
+""",
+    'python': """
       - name: Setup Python
         uses: actions/setup-python@v5
         with:
@@ -146,57 +133,71 @@ jobs:
         uses: actions/cache@v3
         with:
           path: ~/.cache/pip
-          key: ${{ runner.os }}-pip-${{ hashFiles('**/requirements.txt') }}
-          restore-keys: ${{ runner.os }}-pip-
+          key: ${{ runner.os }}-pip-3.11-${{ hashFiles('**/requirements.txt') }}
+          restore-keys: |
+            ${{ runner.os }}-pip-3.11-
+            ${{ runner.os }}-pip-
       - name: Install dependencies
         run: |
           python -m pip install --upgrade pip
           if [ -f requirements.txt ]; then pip install -r requirements.txt; fi
-"""
-    elif lang_key == 'dotnet':
-        setup = """
+""",
+    'dotnet': """
       - name: Setup .NET
         uses: actions/setup-dotnet@v4
         with:
           dotnet-version: '8.0.x'
+      - name: Cache NuGet
+        uses: actions/cache@v3
+        with:
+          path: ~/.nuget/packages
+          key: ${{ runner.os }}-nuget-8-${{ hashFiles('**/*.csproj') }}
+          restore-keys: |
+            ${{ runner.os }}-nuget-8-
+            ${{ runner.os }}-nuget-
       - name: Restore dependencies
         run: dotnet restore
-"""
-    elif lang_key == 'java':
-        setup = """
+""",
+    'java': """
       - name: Setup Java
         uses: actions/setup-java@v4
         with:
           distribution: 'temurin'
           java-version: '17'
-"""
+      - name: Cache Maven
+        uses: actions/cache@v3
+        with:
+          path: ~/.m2/repository
+          key: ${{ runner.os }}-maven-17-${{ hashFiles('**/pom.xml') }}
+          restore-keys: |
+            ${{ runner.os }}-maven-17-
+            ${{ runner.os }}-maven-
+""",
+}
 
-    build_steps = f"""
+_BUILD_STEPS = Template("""
       - name: Build
-        run: {real_build_cmd}
+        run: $build_cmd
       - name: Test
-        run: {real_test_cmd}
+        run: $test_cmd
       - name: Build Docker Image
-        run: docker build . -t app:${{{{ github.sha }}}}
-"""
+        run: docker build . -t app:${{ github.sha }}
+""")
 
-    # Prepare Artifact for Pages (if target is pages)
-    upload_step = ""
-    if deploy_target == "github-pages":
-        upload_step = """
+# Prepare Artifact for Pages (if target is pages)
+_UPLOAD_BY_TARGET = {
+    'github-pages': """
       - name: Upload artifact
         uses: actions/upload-pages-artifact@v3
         with:
           path: '.'
-"""
+""",
+}
 
-    # -------------------------------------------------------------
-    # DEPLOY JOB
-    # -------------------------------------------------------------
-    deploy_job = ""
-    
-    if deploy_target == "github-pages":
-        deploy_job = """
+# Deploy job templates. string.Template's safe_substitute fills $repo_name and leaves
+# GitHub Actions ${{ ... }} expressions untouched, so no brace escaping is needed.
+_DEPLOY_BY_TARGET = {
+    'github-pages': Template("""
   deploy:
     environment:
       name: github-pages
@@ -208,9 +209,8 @@ jobs:
       - name: Deploy to GitHub Pages
         id: deployment
         uses: actions/deploy-pages@v4
-"""
-    elif deploy_target == "azure-webapps":
-        deploy_job = f"""
+"""),
+    'azure-webapps': Template("""
   deploy:
     name: Deploy to Azure Web Apps
     needs: build-test
@@ -222,9 +222,38 @@ jobs:
       - name: Deploy
         uses: azure/webapps-deploy@v2
         with:
-          app-name: {repo_name}
-          publish-profile: ${{{{ secrets.AZURE_PUBLISH_PROFILE }}}}
+          app-name: $repo_name
+          publish-profile: ${{ secrets.AZURE_PUBLISH_PROFILE }}
           package: .
-"""
+"""),
+}
+
+
+# Pure function of its string arguments, so identical requests reuse the generated YAML
+@lru_cache(maxsize=256)
+def generate_workflow(repo, language, build_cmd, test_cmd, deploy_target):
+    # Bounded split: only the owner and name segments are ever needed
+    repo_name = repo.split('/', 2)[1] if '/' in repo else repo
+    
+    # Analyze Payload to determine defaults if commands are placeholders/empty
+    language = (language or '').lower()
+    
+    # Default to GitHub Pages if not specified
+    deploy_target = deploy_target or "github-pages"
+    
+    # Map synonyms; default to python if unknown
+    lang_key = _LANG_ALIAS.get(language, language if language in _DEFAULT_COMMANDS else 'python')
+    defaults = _DEFAULT_COMMANDS[lang_key]
+
+    # Resolve commands: Use provided CMD if valid, else default
+    real_build_cmd = build_cmd if build_cmd and "{" not in build_cmd else defaults['build']
+    real_test_cmd = test_cmd if test_cmd and "{" not in test_cmd else defaults['test']
+
+    build_steps = _BUILD_STEPS.safe_substitute(build_cmd=real_build_cmd, test_cmd=real_test_cmd)
+
+    setup = _SETUP_BY_LANG[lang_key]
+    upload_step = _UPLOAD_BY_TARGET.get(deploy_target, "")
+    deploy_template = _DEPLOY_BY_TARGET.get(deploy_target)
+    deploy_job = deploy_template.safe_substitute(repo_name=repo_name) if deploy_template else ""
     
-    return header + setup + build_steps + upload_step + deploy_job
+    return "".join((_WORKFLOW_HEADER, setup, build_steps, upload_step, deploy_job))